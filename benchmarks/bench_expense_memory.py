@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Expense Memory Benchmark
+Measures bytes per Expense for the slotted layout against the previous
+__dict__ + datetime layout
+
+Usage: python benchmarks/bench_expense_memory.py [row_count]
+"""
+
+import datetime
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expense import Expense
+
+class LegacyExpense:
+    """Previous Expense layout: per-instance __dict__ and a datetime"""
+    
+    def __init__(self, amount, category, date, description=""):
+        self.amount = round(float(amount), 2)
+        self.category = category
+        datetime.datetime.strptime(date, "%Y-%m-%d")
+        self.date = date
+        self.description = description.strip()
+        self.created_at = datetime.datetime.now()
+
+def make_lines(count):
+    """Build raw CSV-style lines (amount,category,date,description)"""
+    rng = random.Random(42)
+    start = datetime.date(2023, 1, 1)
+    lines = []
+    for _ in range(count):
+        day = start + datetime.timedelta(days=rng.randint(0, 730))
+        lines.append(",".join([
+            f"{rng.uniform(50, 5000):.2f}",
+            rng.choice(Expense.CATEGORIES),
+            day.strftime("%Y-%m-%d"),
+            rng.choice(["Groceries", "Petrol", "Coffee", "Electricity bill"])
+        ]))
+    return lines
+
+def measure(factory, lines):
+    """Return bytes retained per object built by factory"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Split inside the measurement so each row gets fresh strings, as
+    # it does when read from a CSV file
+    objects = [factory(*line.split(",")) for line in lines]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    # Exclude the list holding the objects
+    list_bytes = sys.getsizeof(objects)
+    return (after - before - list_bytes) / len(objects)
+
+def main():
+    """Run the benchmark and print bytes per expense"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    lines = make_lines(count)
+    
+    legacy = measure(LegacyExpense, lines)
+    slotted = measure(Expense, lines)
+    
+    print(f"Rows measured: {count:,}")
+    print(f"Before (__dict__ + datetime): {legacy:8.1f} bytes/expense")
+    print(f"After  (__slots__):           {slotted:8.1f} bytes/expense")
+    print(f"Saved: {(1 - slotted / legacy) * 100:5.1f}%")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Daily Totals Module
+Per-day and per-category prefix sums for constant-time range totals
+"""
+
+from array import array
+from datetime import date
+from itertools import accumulate
+
+class DailyTotals:
+    """
+    Per-day totals with cumulative (prefix-sum) arrays
+    
+    One row of daily totals is kept per category code plus one for all
+    categories, covering a contiguous window of day ordinals. The sum
+    over any date range is the difference of two cumulative values.
+    
+    Adding an expense updates its day in O(1) and marks the cumulative
+    arrays dirty from that day on; they are brought up to date lazily on
+    the next query. Expenses usually land on recent days, so the catch-up
+    only covers a few trailing entries.
+    
+    The dense window only grows over days within DENSE_YEARS_BACK years
+    before and DENSE_YEARS_AHEAD years after today. A stray date such as
+    9999-12-31 goes to a small sparse table instead, so it cannot make
+    the arrays (and every copy of them) span thousands of years.
+    """
+    
+    DENSE_YEARS_BACK = 100
+    DENSE_YEARS_AHEAD = 10
+    
+    def __init__(self, category_count):
+        """
+        Initialize empty totals
+        
+        Args:
+            category_count (int): Number of category codes
+        """
+        self.category_count = category_count
+        self.first_day = None
+        # Index category_count holds the all-categories row
+        self.daily = [array("q") for _ in range(category_count + 1)]
+        self.cumulative = [array("q", [0]) for _ in range(category_count + 1)]
+        self._dirty_from = None
+        
+        today = date.today().toordinal()
+        self.dense_start = today - round(365.25 * self.DENSE_YEARS_BACK)
+        self.dense_end = today + round(365.25 * self.DENSE_YEARS_AHEAD)
+        # Day ordinal -> per-category totals (all-categories last) for
+        # days outside the dense range
+        self.sparse = {}
+    
+    def add(self, day, category_code, amount_paise):
+        """
+        Add an amount to a day
+        
+        Args:
+            day (int): Day ordinal
+            category_code (int): Category code
+            amount_paise (int): Amount in paise (negative to subtract)
+        """
+        if not self.dense_start <= day <= self.dense_end:
+            totals = self.sparse.get(day)
+            if totals is None:
+                totals = self.sparse[day] = array("q", bytes(8 * (self.category_count + 1)))
+            totals[category_code] += amount_paise
+            totals[self.category_count] += amount_paise
+            if not any(totals):
+                del self.sparse[day]
+            return
+        
+        self._cover(day)
+        offset = day - self.first_day
+        self.daily[category_code][offset] += amount_paise
+        self.daily[self.category_count][offset] += amount_paise
+        if self._dirty_from is None or offset < self._dirty_from:
+            self._dirty_from = offset
+    
+    def _cover(self, day):
+        """Grow the window so that it includes day"""
+        if self.first_day is None:
+            self.first_day = day
+        if day < self.first_day:
+            padding = self.first_day - day
+            for row in self.daily:
+                row[0:0] = array("q", bytes(8 * padding))
+            self.first_day = day
+            self._dirty_from = 0
+        end = day - self.first_day + 1
+        covered = len(self.daily[0])
+        if end > covered:
+            for row in self.daily:
+                row.extend(array("q", bytes(8 * (end - covered))))
+            if self._dirty_from is None or covered < self._dirty_from:
+                self._dirty_from = covered
+    
+    def _refresh(self):
+        """Recompute cumulative arrays from the first dirty day"""
+        start = self._dirty_from
+        if start is None:
+            return
+        for row, cumulative in zip(self.daily, self.cumulative):
+            del cumulative[start + 1:]
+            cumulative.extend(accumulate(row[start:], initial=cumulative[start]))
+            # accumulate repeats the initial value first
+            del cumulative[start + 1]
+        self._dirty_from = None
+    
+    def range_total(self, start_day, end_day, category_code=None):
+        """
+        Total paise between two days (inclusive)
+        
+        Args:
+            start_day (int): First day ordinal
+            end_day (int): Last day ordinal
+            category_code (int): Category code, or None for all categories
+        
+        Returns:
+            int: Total in paise
+        """
+        code = self.category_count if category_code is None else category_code
+        total = 0
+        for day, totals in self.sparse.items():
+            if start_day <= day <= end_day:
+                total += totals[code]
+        
+        if self.first_day is None:
+            return total
+        self._refresh()
+        row = self.cumulative[code]
+        start = min(max(start_day - self.first_day, 0), len(row) - 1)
+        end = min(max(end_day - self.first_day + 1, 0), len(row) - 1)
+        return total + (row[end] - row[start] if end > start else 0)
+    
+    def category_totals(self, start_day, end_day):
+        """
+        Totals per category code between two days (inclusive)
+        
+        Returns:
+            list: Total paise indexed by category code
+        """
+        return [self.range_total(start_day, end_day, code) for code in range(self.category_count)]
+    
+    def average_per_day(self, start_day, end_day, category_code=None):
+        """Average paise per calendar day between two days (inclusive)"""
+        days = end_day - start_day + 1
+        if days <= 0:
+            return 0
+        return self.range_total(start_day, end_day, category_code) / days
\ No newline at end of file
@@ -4,6 +4,7 @@ Handles expense creation and management
 """
 
 import datetime
+from utils import to_paise, paise_to_str, parse_date
 
 class Expense:
     """Expense class to represent a single expense entry"""
@@ -15,6 +16,9 @@ class Expense:
         "Education", "Other"
     ]
     
+    # Fixed attribute layout: no per-instance __dict__
+    __slots__ = ("amount_paise", "category", "date", "day", "description", "_created_ts")
+    
     def __init__(self, amount, category, date, description=""):
         """
         Initialize a new Expense
@@ -25,33 +29,81 @@ class Expense:
             date (str): Date in YYYY-MM-DD format
             description (str): Description of expense
         """
-        self.amount = self._validate_amount(amount)
+        self.amount_paise = self._validate_amount(amount)
         self.category = self._validate_category(category)
-        self.date = self._validate_date(date)
+        self.date, self.day = self._validate_date(date)
         self.description = description.strip()
-        self.created_at = datetime.datetime.now()
+        self._created_ts = datetime.datetime.now().timestamp()
+    
+    @classmethod
+    def from_trusted(cls, amount_paise, category, date, day, description, created_ts):
+        """
+        Build an Expense from fields that are already known to be valid
+        
+        Skips constructor validation; only for data the app wrote itself
+        (e.g. a checksum-verified expenses file).
+        
+        Args:
+            amount_paise (int): Amount in paise
+            category (str): Canonical category name
+            date (str): Date in YYYY-MM-DD format
+            day (int): Day ordinal of date
+            description (str): Description of expense
+            created_ts (float): Creation time as a POSIX timestamp
+        
+        Returns:
+            Expense: New expense
+        """
+        expense = cls.__new__(cls)
+        expense.amount_paise = amount_paise
+        expense.category = category
+        expense.date = date
+        expense.day = day
+        expense.description = description
+        expense._created_ts = created_ts
+        return expense
+    
+    @property
+    def amount(self):
+        """Amount in rupees (display only; arithmetic uses amount_paise)"""
+        return self.amount_paise / 100
+    
+    @property
+    def created_at(self):
+        """Creation time as a datetime (stored as a POSIX timestamp)"""
+        return datetime.datetime.fromtimestamp(self._created_ts)
+    
+    @created_at.setter
+    def created_at(self, value):
+        self._created_ts = value.timestamp()
     
     def _validate_amount(self, amount):
-        """Validate and convert amount to float"""
+        """Validate and convert amount to integer paise"""
         try:
-            amount_float = float(amount)
-            if amount_float <= 0:
-                raise ValueError("Amount must be greater than 0")
-            return round(amount_float, 2)
-        except (ValueError, TypeError):
+            paise = to_paise(amount)
+        except TypeError:
             raise ValueError("Amount must be a valid number")
+        if paise <= 0:
+            raise ValueError("Amount must be greater than 0")
+        return paise
     
     def _validate_category(self, category):
         """Validate category is in allowed list"""
         if category not in self.CATEGORIES:
             raise ValueError(f"Category must be one of: {', '.join(self.CATEGORIES)}")
-        return category
+        # Share the canonical string instead of keeping one copy per row
+        return self.CATEGORIES[self.CATEGORIES.index(category)]
     
     def _validate_date(self, date_str):
-        """Validate date format is YYYY-MM-DD"""
+        """
+        Validate date format is YYYY-MM-DD
+        
+        Returns:
+            tuple: (date string, day ordinal); parse_date caches both, so
+                rows with the same date share one string and one int
+        """
         try:
-            datetime.datetime.strptime(date_str, "%Y-%m-%d")
-            return date_str
+            return parse_date(date_str)
         except ValueError:
             raise ValueError("Date must be in YYYY-MM-DD format")
     
@@ -67,7 +119,7 @@ class Expense:
     
     def __str__(self):
         """String representation of expense"""
-        return f"[{self.date}] {self.category}: ₹{self.amount:.2f} - {self.description}"
+        return f"[{self.date}] {self.category}: ₹{paise_to_str(self.amount_paise)} - {self.description}"
     
     def __repr__(self):
         """Detailed representation"""
@@ -6,29 +6,227 @@ Main controller that ties all components together
 from file_manager import FileManager
 from reports import ReportGenerator
 from expense import Expense
-from utils import get_current_month
+from expense_table import ExpenseTable
+from expense_stats import StatisticsEngine
+from result_cache import ResultCache
+from utils import get_current_month, parse_date, paise_to_str
 import random
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 class ExpenseManager:
     """Main controller class for expense management"""
     
-    def __init__(self):
-        """Initialize expense manager"""
-        self.file_manager = FileManager()
-        self.expenses = []
+    def __init__(self, autosave=False, autosave_interval=FileManager.AUTOSAVE_INTERVAL):
+        """
+        Initialize expense manager
+        
+        Args:
+            autosave (bool): Save changes on a background thread instead
+                of writing on every add, edit or delete
+            autosave_interval (float): Seconds between background saves
+        """
+        self.file_manager = FileManager(use_journal=True, delta_backups=True)
+        self.expenses = ExpenseTable()
         self.report_generator = None
+        self.statistics = StatisticsEngine()
+        self.data_version = 0
+        self.result_cache = ResultCache()
+        self._transaction_depth = 0
+        self._transaction_dirty = False
+        self._transaction_snapshot = None
+        # Guards the switch into and out of a transaction against the
+        # autosave thread taking its copy
+        self._snapshot_lock = threading.Lock()
+        self.autosave_interval = autosave_interval if autosave else None
         self.load_expenses()
+        if autosave:
+            self.file_manager.start_autosave(self._autosave_snapshot, autosave_interval)
+    
+    def _data_changed(self):
+        """Bump the data version so cached results are recomputed"""
+        self.data_version += 1
+    
+    def _cached(self, query, params, compute):
+        """Return a result cached for the current data version"""
+        return self.result_cache.get_or_compute(query, params, self.data_version, compute)
+    
+    def get_cache_stats(self):
+        """Get result cache hit/miss counters"""
+        return self.result_cache.stats()
     
     def load_expenses(self):
         """Load expenses from file"""
-        self.expenses = self.file_manager.load_expenses()
-        self.report_generator = ReportGenerator(self.expenses)
+        self._data_changed()
+        self.expenses = self.file_manager.load_expenses(ExpenseTable())
+        if self.report_generator is None:
+            self.report_generator = ReportGenerator(self.expenses)
+        else:
+            self.report_generator.reset(self.expenses)
+        self.statistics.reset(self.expenses)
     
     def save_expenses(self):
-        """Save expenses to file"""
+        """Save expenses to file (also compacts the journal)"""
         return self.file_manager.save_expenses(self.expenses)
     
+    def backup(self):
+        """
+        Back up the expenses, including changes not yet autosaved
+        
+        Returns:
+            str: Path of the backup file, or None on failure
+        """
+        if not self.file_manager.flush():
+            return None
+        return self.file_manager.create_backup()
+    
+    def _autosave_snapshot(self):
+        """
+        Consistent copy of the expenses for the autosave thread
+        
+        While a transaction is open this is the state at its start, so
+        uncommitted (and possibly rolled back) changes are never saved.
+        """
+        with self._snapshot_lock:
+            if self._transaction_depth:
+                return self._transaction_snapshot.copy()
+            return self.expenses.copy()
+    
+    def close(self):
+        """
+        Persist everything before the application exits
+        
+        With autosave this stops the background writer after a final
+        flush; otherwise the expenses are saved (compacting the journal).
+        
+        Returns:
+            bool: True if successful
+        """
+        if self.file_manager.autosave_enabled:
+            saved = self.file_manager.stop_autosave()
+        elif self.file_manager.store is not None:
+            saved = True  # every change is already committed
+        else:
+            saved = self.save_expenses()
+        self.file_manager.close()
+        return saved
+    
+    def migrate_storage(self, backend):
+        """
+        Move the stored expenses to another storage backend
+        
+        The new backend becomes the default for the next start; the old
+        backend's files are kept.
+        
+        Args:
+            backend (str): "csv", "sqlite" or "partitioned"
+        
+        Returns:
+            bool: True if successful
+        """
+        if backend == self.file_manager.backend:
+            return True
+        
+        # Pending write-behind changes go to the old backend first
+        if not self.file_manager.stop_autosave():
+            return False
+        
+        target = self.file_manager.migrate(backend, self.expenses)
+        if target is not None:
+            self.file_manager.close()
+            self.file_manager = target
+        
+        if self.autosave_interval:
+            self.file_manager.start_autosave(self._autosave_snapshot, self.autosave_interval)
+        return target is not None
+    
+    def _commit(self, appended=None, backup=False, cleared=False, deleted=None, updated=None):
+        """
+        Persist a change, or defer it to the end of the open transaction
+        
+        Args:
+            appended (list): Expenses that were only appended, which can
+                go to the journal instead of a full save
+            backup (bool): Take a (throttled) backup before a journal append
+            cleared (bool): All earlier expenses were removed before
+                appended (which may be empty)
+            deleted (int): Position of the only expense that was deleted
+            updated (int): Position of the only expense that was edited
+        
+        Returns:
+            bool: True if successful (or deferred)
+        """
+        if self._transaction_depth:
+            self._transaction_dirty = True
+            return True
+        if self.file_manager.autosave_enabled:
+            # Write-behind: the autosave thread picks the change up
+            self.file_manager.mark_dirty()
+            return True
+        if (appended is not None or cleared) and self.file_manager.incremental_writes:
+            if backup:
+                self.file_manager.backup_if_due()
+            return self.file_manager.append_expenses(appended or [], clear=cleared)
+        if deleted is not None and self.file_manager.row_writes:
+            return self.file_manager.delete_row(deleted)
+        if updated is not None and self.file_manager.row_writes:
+            return self.file_manager.update_row(updated, self.expenses.row_expense(updated))
+        return self.save_expenses()
+    
+    def _rebuild_derived(self):
+        """Rebuild report aggregates and statistics from self.expenses"""
+        self._data_changed()
+        self.report_generator.reset(self.expenses)
+        self.statistics.reset(self.expenses)
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group adds, edits and deletes into one unit of work
+        
+        Changes made inside the block are persisted once on exit, with a
+        single backup and a single write. If the block raises, the
+        in-memory data is rolled back to its state at entry and nothing
+        is written. Nested transactions join the outermost one.
+        
+        Usage:
+            with expense_manager.transaction():
+                expense_manager.add_expense(...)
+                expense_manager.delete_expense(0)
+        
+        Yields:
+            ExpenseManager: self
+        """
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            return
+        
+        with self._snapshot_lock:
+            snapshot = self._transaction_snapshot = self.expenses.copy()
+            self._transaction_depth = 1
+        self._transaction_dirty = False
+        try:
+            yield self
+        except BaseException:
+            with self._snapshot_lock:
+                self._transaction_depth = 0
+                self._transaction_snapshot = None
+                self.expenses = snapshot
+            self._rebuild_derived()
+            raise
+        
+        with self._snapshot_lock:
+            self._transaction_depth = 0
+            self._transaction_snapshot = None
+        if self._transaction_dirty:
+            if not self._commit():
+                raise IOError("Could not save transaction")
+    
     def add_expense(self, expense):
         """
         Add a new expense
@@ -41,16 +239,122 @@ class ExpenseManager:
         """
         try:
             self.expenses.append(expense)
-            self.report_generator = ReportGenerator(self.expenses)
-            success = self.save_expenses()
-            return success
+            self.report_generator.add(expense)
+            self.statistics.add(expense)
+            self._data_changed()
+            return self._commit(appended=[expense])
         except Exception as e:
             print(f"Error adding expense: {e}")
             return False
     
+    def delete_expense(self, index):
+        """
+        Delete an expense
+        
+        Args:
+            index (int): Position of the expense in self.expenses
+        
+        Returns:
+            bool: True if successful
+        """
+        try:
+            removed = self.expenses.row_expense(index)
+            self.expenses.delete(index)
+            self.report_generator.remove(removed)
+            self.statistics.remove(removed)
+            self._data_changed()
+            return self._commit(deleted=index)
+        except IndexError:
+            print(f"Error deleting expense: no expense at position {index}")
+            return False
+    
+    def update_expense(self, index, amount=None, category=None, date=None, description=None):
+        """
+        Edit an expense; omitted fields keep their current value
+        
+        Args:
+            index (int): Position of the expense in self.expenses
+            amount: New amount in rupees
+            category (str): New category
+            date (str): New date (YYYY-MM-DD)
+            description (str): New description
+        
+        Returns:
+            bool: True if successful
+        """
+        try:
+            old = self.expenses.row_expense(index)
+            new = Expense(
+                amount if amount is not None else paise_to_str(old.amount_paise),
+                category if category is not None else old.category,
+                date if date is not None else old.date,
+                description if description is not None else old.description
+            )
+            self.expenses.update(index, new)
+            self.report_generator.remove(old)
+            self.report_generator.add(new)
+            self.statistics.remove(old)
+            self._data_changed()
+            return self._commit(updated=index)
+        except (IndexError, ValueError) as e:
+            print(f"Error updating expense: {e}")
+            return False
+    
+    def add_expenses(self, items):
+        """
+        Add many expenses with one index update pass and a single commit
+        
+        Each item is validated on its own; invalid items are reported
+        and skipped without aborting the batch. Valid expenses are then
+        persisted once: one backup plus one journal append (or one full
+        save when journaling is off).
+        
+        Args:
+            items (iterable): Expense objects or dicts with amount,
+                category, date and optional description
+        
+        Returns:
+            dict: "added" count, "errors" as (position, message) pairs and
+                "saved" (bool)
+        """
+        valid = []
+        errors = []
+        for position, item in enumerate(items):
+            try:
+                if isinstance(item, Expense):
+                    valid.append(item)
+                else:
+                    valid.append(Expense(
+                        item["amount"],
+                        item["category"],
+                        item["date"],
+                        item.get("description", "")
+                    ))
+            except KeyError as e:
+                errors.append((position, f"Missing field: {e.args[0]}"))
+            except (ValueError, TypeError, AttributeError) as e:
+                errors.append((position, str(e)))
+        
+        if not valid:
+            return {"added": 0, "errors": errors, "saved": True}
+        
+        for expense in valid:
+            self.expenses.append(expense)
+            self.report_generator.add(expense)
+            self.statistics.add(expense)
+        self._data_changed()
+        
+        try:
+            saved = self._commit(appended=valid, backup=True)
+        except Exception as e:
+            print(f"Error adding expenses: {e}")
+            saved = False
+        
+        return {"added": len(valid), "errors": errors, "saved": saved}
+    
     def get_total_expenses(self):
-        """Get total of all expenses"""
-        return sum(expense.amount for expense in self.expenses)
+        """Get total of all expenses in paise"""
+        return self.report_generator.total
     
     def get_monthly_expenses(self, month=None):
         """
@@ -65,22 +369,127 @@ class ExpenseManager:
         if not month:
             month = get_current_month()
         
-        return [
-            exp for exp in self.expenses 
-            if exp.date.startswith(month)
-        ]
+        return self._cached("monthly_expenses", (month,), lambda: [
+            self.expenses[index] for index in self.expenses.month_rows(month)
+        ])
+    
+    def query_range(self, start_date, end_date):
+        """
+        Get expenses, totals and counts for a date range
+        
+        Backed by the table's date-sorted index, so the lookup is two
+        bisections plus the matching rows; use utils.quarter_range,
+        fiscal_year_range or last_n_days for common spans.
+        
+        Args:
+            start_date (str): First date (YYYY-MM-DD, inclusive)
+            end_date (str): Last date (YYYY-MM-DD, inclusive)
+        
+        Returns:
+            dict: Matching expenses in date order, total (paise), count
+                and per-category totals (paise)
+        """
+        return self._cached("query_range", (start_date, end_date),
+                            lambda: self._query_range(start_date, end_date))
+    
+    def _query_range(self, start_date, end_date):
+        """Compute query_range results"""
+        _, start_day = parse_date(start_date)
+        _, end_day = parse_date(end_date)
+        rows = self.expenses.rows_between(start_day, end_day)
+        
+        amounts = self.expenses.amounts
+        codes = self.expenses.categories
+        category_totals = {}
+        for index in rows:
+            category = Expense.CATEGORIES[codes[index]]
+            category_totals[category] = category_totals.get(category, 0) + amounts[index]
+        
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "expenses": [self.expenses[index] for index in rows],
+            "total": sum(map(amounts.__getitem__, rows)),
+            "count": len(rows),
+            "category_totals": category_totals
+        }
+    
+    def get_range_totals(self, start_date, end_date):
+        """
+        Get totals for a date range from the per-day prefix sums
+        
+        Runs in constant time (per category) regardless of how many
+        expenses are stored.
+        
+        Args:
+            start_date (str): First date (YYYY-MM-DD, inclusive)
+            end_date (str): Last date (YYYY-MM-DD, inclusive)
+        
+        Returns:
+            dict: Total (paise), per-category totals (paise), number of
+                days and average per day (paise)
+        """
+        _, start_day = parse_date(start_date)
+        _, end_day = parse_date(end_date)
+        daily_totals = self.expenses.daily_totals
+        
+        category_totals = {}
+        for code, amount in enumerate(daily_totals.category_totals(start_day, end_day)):
+            if amount:
+                category_totals[Expense.CATEGORIES[code]] = amount
+        
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "total": daily_totals.range_total(start_day, end_day),
+            "category_totals": category_totals,
+            "days": max(end_day - start_day + 1, 0),
+            "avg_per_day": daily_totals.average_per_day(start_day, end_day)
+        }
+    
+    def stream_summary(self, start_date=None, end_date=None, categories=None):
+        """
+        Aggregate stored expenses without loading them into memory
+        
+        Runs as SQL with the sqlite backend.
+        
+        Args:
+            start_date (str): Earliest date to include (YYYY-MM-DD)
+            end_date (str): Latest date to include (YYYY-MM-DD)
+            categories (iterable): Categories to include (default: all)
+        
+        Returns:
+            dict: Total (paise), count and per-category totals (paise)
+        """
+        return self.file_manager.summarize(start_date, end_date, categories)
     
     def get_category_summary(self):
         """Get category-wise expense summary"""
-        return self.report_generator.get_category_summary()
+        return self._cached("category_summary", (), self.report_generator.get_category_summary)
     
     def get_monthly_report(self, month=None):
         """Get monthly expense report"""
-        return self.report_generator.get_monthly_report(month)
+        if not month:
+            month = get_current_month()
+        return self._cached("monthly_report", (month,),
+                            lambda: self.report_generator.get_monthly_report(month))
+    
+    def get_stored_monthly_report(self, month=None):
+        """
+        Build a monthly report from storage instead of the loaded table
+        
+        With the partitioned backend only that month's partition is
+        read, so the report never needs the rest of the history.
+        """
+        if not month:
+            month = get_current_month()
+        month_expenses = self.file_manager.load_month(month)
+        return ReportGenerator(month_expenses, self.report_generator.export_folder).get_monthly_report(month)
     
     def search_expenses(self, search_term, search_by="all"):
         """Search expenses by criteria"""
-        return self.report_generator.search_expenses(search_term, search_by)
+        return self._cached("search", (search_term, search_by),
+                            lambda: self.report_generator.search_expenses(search_term, search_by))
     
     def export_report(self, report_data, report_type):
         """Export report to file"""
@@ -88,9 +497,11 @@ class ExpenseManager:
     
     def clear_all_expenses(self):
         """Clear all expenses"""
-        self.expenses = []
-        self.report_generator = ReportGenerator(self.expenses)
-        self.save_expenses()
+        self._data_changed()
+        self.expenses = ExpenseTable()
+        self.report_generator.reset(self.expenses)
+        self.statistics.reset(self.expenses)
+        self._commit(cleared=True)
     
     def generate_sample_data(self, count=10):
         """Generate sample expense data for testing"""
@@ -103,7 +514,8 @@ class ExpenseManager:
         ]
         
         # Clear existing data first
-        self.expenses = []
+        self._data_changed()
+        self.expenses = ExpenseTable()
         
         # Generate sample expenses
         start_date = datetime.now() - timedelta(days=30)
@@ -117,40 +529,15 @@ class ExpenseManager:
             expense = Expense(amount, category, date, description)
             self.expenses.append(expense)
         
-        self.report_generator = ReportGenerator(self.expenses)
-        self.save_expenses()
+        self.report_generator.reset(self.expenses)
+        self.statistics.reset(self.expenses)
+        self._commit(appended=list(self.expenses), cleared=True)
     
     def get_statistics(self):
-        """Get comprehensive statistics"""
-        if not self.expenses:
-            return {}
-        
-        # Basic stats
-        amounts = [exp.amount for exp in self.expenses]
-        dates = [exp.date for exp in self.expenses]
-        
-        # Monthly stats
-        monthly_stats = {}
-        for exp in self.expenses:
-            month = exp.date[:7]  # YYYY-MM
-            if month not in monthly_stats:
-                monthly_stats[month] = {"total": 0, "count": 0}
-            monthly_stats[month]["total"] += exp.amount
-            monthly_stats[month]["count"] += 1
-        
-        # Category totals
-        category_totals = {}
-        for exp in self.expenses:
-            category_totals[exp.category] = category_totals.get(exp.category, 0) + exp.amount
+        """
+        Get comprehensive statistics (amounts in paise)
         
-        return {
-            "total": sum(amounts),
-            "count": len(amounts),
-            "average": sum(amounts) / len(amounts) if amounts else 0,
-            "min": min(amounts) if amounts else 0,
-            "max": max(amounts) if amounts else 0,
-            "start_date": min(dates) if dates else "",
-            "end_date": max(dates) if dates else "",
-            "monthly_stats": monthly_stats,
-            "category_totals": category_totals
-        }
\ No newline at end of file
+        Read from the incrementally maintained statistics engine; no
+        pass over the expenses is needed.
+        """
+        return self._cached("statistics", (), self.statistics.get_statistics)
\ No newline at end of file
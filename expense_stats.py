@@ -0,0 +1,235 @@
+"""
+Expense Statistics Module
+Single-pass, mergeable statistics accumulators
+"""
+
+import datetime
+
+class StatsAccumulator:
+    """
+    Running count, sum, min, max, mean, variance and date range
+    
+    Values are added one at a time (Welford's method) and two
+    accumulators can be merged (Chan et al.), so statistics can be built
+    per partition or per process and combined afterwards. Instances are
+    plain picklable objects; to_state()/from_state() give a JSON-safe form.
+    """
+    
+    __slots__ = ("count", "total", "minimum", "maximum", "mean", "m2", "first_day", "last_day")
+    
+    def __init__(self):
+        """Initialize an empty accumulator"""
+        self.count = 0
+        self.total = 0          # paise, exact
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self.m2 = 0.0           # sum of squared deviations from the mean
+        self.first_day = None
+        self.last_day = None
+    
+    def add(self, amount_paise, day):
+        """
+        Add one expense
+        
+        Args:
+            amount_paise (int): Amount in paise
+            day (int): Day ordinal of the expense
+        """
+        self.count += 1
+        self.total += amount_paise
+        delta = amount_paise - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (amount_paise - self.mean)
+        
+        if self.minimum is None or amount_paise < self.minimum:
+            self.minimum = amount_paise
+        if self.maximum is None or amount_paise > self.maximum:
+            self.maximum = amount_paise
+        if self.first_day is None or day < self.first_day:
+            self.first_day = day
+        if self.last_day is None or day > self.last_day:
+            self.last_day = day
+    
+    def merge(self, other):
+        """
+        Fold another accumulator into this one
+        
+        Args:
+            other (StatsAccumulator): Accumulator to merge
+        
+        Returns:
+            StatsAccumulator: self
+        """
+        if not other.count:
+            return self
+        if not self.count:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return self
+        
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.first_day = min(self.first_day, other.first_day)
+        self.last_day = max(self.last_day, other.last_day)
+        return self
+    
+    @property
+    def variance(self):
+        """Population variance of amounts (paise squared)"""
+        return self.m2 / self.count if self.count else 0.0
+    
+    @property
+    def std_dev(self):
+        """Population standard deviation of amounts (paise)"""
+        return self.variance ** 0.5
+    
+    def to_state(self):
+        """Get a JSON-serializable snapshot"""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an accumulator from to_state() output"""
+        accumulator = cls()
+        for name in cls.__slots__:
+            setattr(accumulator, name, state[name])
+        return accumulator
+    
+    def summary(self):
+        """
+        Get the statistics as a dictionary
+        
+        Returns:
+            dict: total, count, average, min, max, variance, std_dev (paise)
+                and start/end dates (YYYY-MM-DD)
+        """
+        return {
+            "total": self.total,
+            "count": self.count,
+            "average": self.total / self.count if self.count else 0,
+            "min": self.minimum or 0,
+            "max": self.maximum or 0,
+            "variance": self.variance,
+            "std_dev": self.std_dev,
+            "start_date": datetime.date.fromordinal(self.first_day).isoformat() if self.first_day else "",
+            "end_date": datetime.date.fromordinal(self.last_day).isoformat() if self.last_day else ""
+        }
+
+class StatisticsEngine:
+    """
+    Overall, per-month and per-category statistics in one pass
+    
+    Kept up to date by add(). Removing an expense cannot be undone for
+    min/max, so remove() marks the engine stale and the next read
+    rebuilds it from the expense collection and the engines merged into it.
+    """
+    
+    def __init__(self, expenses=()):
+        """
+        Initialize the engine
+        
+        Args:
+            expenses: Expense collection to accumulate
+        """
+        self.reset(expenses)
+    
+    def reset(self, expenses):
+        """Rebuild every accumulator from an expense collection in one pass (drops merged engines)"""
+        self.expenses = expenses
+        self._merged = []
+        self._rebuild()
+    
+    def _rebuild(self):
+        """Accumulate the expense collection, then fold in the merged engines"""
+        self.overall = StatsAccumulator()
+        self.monthly = {}
+        self.by_category = {}
+        self._stale = False
+        for expense in self.expenses:
+            self.add(expense)
+        for other in self._merged:
+            self._fold(other)
+    
+    def add(self, expense):
+        """Account for a newly added expense"""
+        amount = expense.amount_paise
+        day = expense.day
+        self.overall.add(amount, day)
+        
+        month = self.monthly.get(expense.date[:7])
+        if month is None:
+            month = self.monthly[expense.date[:7]] = StatsAccumulator()
+        month.add(amount, day)
+        
+        category = self.by_category.get(expense.category)
+        if category is None:
+            category = self.by_category[expense.category] = StatsAccumulator()
+        category.add(amount, day)
+    
+    def remove(self, expense):
+        """Account for a removed expense (rebuilt on next read)"""
+        self._stale = True
+    
+    def merge(self, other):
+        """
+        Fold another engine (e.g. built over another partition) into this one
+        
+        Args:
+            other (StatisticsEngine): Engine to merge
+        
+        Returns:
+            StatisticsEngine: self
+        """
+        self._refresh()
+        self._merged.append(other)
+        self._fold(other)
+        return self
+    
+    def _fold(self, other):
+        """Merge another engine's accumulators into this one's"""
+        other._refresh()
+        self.overall.merge(other.overall)
+        for target, source in ((self.monthly, other.monthly), (self.by_category, other.by_category)):
+            for key, accumulator in source.items():
+                target.setdefault(key, StatsAccumulator()).merge(accumulator)
+    
+    def _refresh(self):
+        """Rebuild after removals, keeping merged engines"""
+        if self._stale:
+            self._rebuild()
+    
+    def get_statistics(self):
+        """
+        Get overall statistics with per-month and per-category breakdowns
+        
+        Returns:
+            dict: Overall summary plus "monthly_stats", "category_totals"
+                and "category_stats" (amounts in paise); empty if no data
+        """
+        self._refresh()
+        if not self.overall.count:
+            return {}
+        
+        statistics = self.overall.summary()
+        statistics["monthly_stats"] = {
+            month: self.monthly[month].summary()
+            for month in sorted(self.monthly)
+            if self.monthly[month].count
+        }
+        statistics["category_stats"] = {
+            category: accumulator.summary()
+            for category, accumulator in self.by_category.items()
+            if accumulator.count
+        }
+        statistics["category_totals"] = {
+            category: summary["total"]
+            for category, summary in statistics["category_stats"].items()
+        }
+        return statistics
\ No newline at end of file
@@ -0,0 +1,363 @@
+"""
+Expense Table Module
+Columnar in-memory storage for expenses
+"""
+
+import copy
+import datetime
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from daily_totals import DailyTotals
+from expense import Expense
+from utils import paise_to_str
+
+class ExpenseTable:
+    """
+    Column-oriented expense store
+    
+    Each field lives in its own typed array: amounts as integer paise,
+    dates as day ordinals and categories as small integer codes, with
+    descriptions kept in a deduplicated string pool. Aggregations run
+    over the arrays with builtins (sum, min, max, compress) instead of
+    walking Python objects attribute by attribute.
+    
+    The table behaves like a list of expenses: len(), iteration and
+    indexing hand out ExpenseRow views that look like Expense objects.
+    
+    A month index (YYYY-MM -> row indexes) is maintained on append so
+    that month lookups only touch that month's rows, and a date-sorted
+    index (day ordinals with their row indexes) answers arbitrary date
+    ranges with two bisections. Per-day, per-category prefix sums
+    (DailyTotals) answer range totals in constant time.
+    
+    Row changes and copy() hold the table lock, so a background writer
+    can take a consistent copy while rows are being added.
+    """
+    
+    def __init__(self, expenses=()):
+        """
+        Initialize the table
+        
+        Args:
+            expenses (iterable): Expense objects to add
+        """
+        self.amounts = array("q")        # integer paise
+        self.days = array("l")           # date.toordinal()
+        self.categories = array("B")     # index into Expense.CATEGORIES
+        self.description_ids = array("L")  # index into the string pool
+        self.created = array("d")        # POSIX timestamps
+        self._pool = []
+        self._pool_ids = {}
+        self._date_strings = {}
+        self._month_rows = {}
+        self._sorted_days = array("l")
+        self._sorted_rows = array("L")
+        self.daily_totals = DailyTotals(len(Expense.CATEGORIES))
+        self.lock = threading.RLock()
+        self.extend(expenses)
+    
+    def append(self, expense):
+        """
+        Add an expense (Expense object or row view) to the table
+        
+        Args:
+            expense: Object with amount, category, date and description
+        """
+        with self.lock:
+            self._append(expense)
+    
+    def _append(self, expense):
+        """Add an expense; the caller holds the lock"""
+        category_code = Expense.CATEGORIES.index(expense.category)
+        created_ts = expense.created_at.timestamp()
+        
+        # Columns first: the amount is the only value that can overflow
+        # its array, and if it does nothing has been changed yet
+        row = len(self.amounts)
+        self.amounts.append(expense.amount_paise)
+        self.days.append(expense.day)
+        self.categories.append(category_code)
+        self.description_ids.append(self._intern_description(expense.description))
+        self.created.append(created_ts)
+        
+        month_rows = self._month_rows.get(expense.date[:7])
+        if month_rows is None:
+            month_rows = self._month_rows[expense.date[:7]] = array("L")
+        month_rows.append(row)
+        
+        # Most expenses arrive in date order, so this is usually an append
+        if not self._sorted_days or expense.day >= self._sorted_days[-1]:
+            self._sorted_days.append(expense.day)
+            self._sorted_rows.append(row)
+        else:
+            position = bisect_right(self._sorted_days, expense.day)
+            self._sorted_days.insert(position, expense.day)
+            self._sorted_rows.insert(position, row)
+        
+        self.daily_totals.add(expense.day, category_code, expense.amount_paise)
+    
+    def extend(self, expenses):
+        """Add several expenses to the table"""
+        with self.lock:
+            for expense in expenses:
+                self._append(expense)
+    
+    def load_columns(self, amounts, days, categories, description_ids, pool, created_ts=None):
+        """
+        Fill an empty table from whole columns (e.g. a binary snapshot)
+        
+        Skips building an Expense per row; the indexes and prefix sums
+        are rebuilt from the columns afterwards.
+        
+        Args:
+            amounts (iterable): Amounts in paise
+            days (iterable): Day ordinals
+            categories (iterable): Category codes
+            description_ids (iterable): Index into pool per row
+            pool (list): Distinct descriptions
+            created_ts (float): Creation timestamp for every row
+                (default: now)
+        """
+        with self.lock:
+            if len(self.amounts):
+                raise ValueError("load_columns needs an empty table")
+            
+            self.amounts = array("q", amounts)
+            self.days = array("l", days)
+            self.categories = array("B", categories)
+            self.description_ids = array("L", description_ids)
+            if created_ts is None:
+                created_ts = datetime.datetime.now().timestamp()
+            self.created = array("d", [created_ts]) * len(self.amounts)
+            self._pool = list(pool)
+            self._pool_ids = {description: index for index, description in enumerate(self._pool)}
+            
+            add = self.daily_totals.add
+            for day, code, amount in zip(self.days, self.categories, self.amounts):
+                add(day, code, amount)
+            self._rebuild_indexes()
+    
+    def copy(self):
+        """Independent copy of the table (transaction rollback, autosave)"""
+        with self.lock:
+            return copy.deepcopy(self)
+    
+    def __getstate__(self):
+        # Locks cannot be copied or pickled
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+    
+    def row_expense(self, index):
+        """
+        Detached Expense holding the values of a row
+        
+        Unlike an ExpenseRow view it does not change when rows are
+        deleted or updated.
+        """
+        day = self.days[index]
+        return Expense.from_trusted(
+            self.amounts[index],
+            Expense.CATEGORIES[self.categories[index]],
+            self.date_string(day),
+            day,
+            self.description(index),
+            self.created[index]
+        )
+    
+    def delete(self, index):
+        """
+        Remove the row at index; later rows move up by one
+        
+        Costs O(rows) to shift the columns and rebuild the month and
+        date indexes.
+        """
+        with self.lock:
+            self.daily_totals.add(self.days[index], self.categories[index], -self.amounts[index])
+            for column in (self.amounts, self.days, self.categories, self.description_ids, self.created):
+                del column[index]
+            self._rebuild_indexes()
+    
+    def update(self, index, expense):
+        """
+        Replace the values of the row at index
+        
+        Args:
+            index (int): Row to replace
+            expense: Object with the new amount, category, date and description
+        """
+        with self.lock:
+            old_day = self.days[index]
+            old_amount = self.amounts[index]
+            category_code = Expense.CATEGORIES.index(expense.category)
+            # Assigned first so an out-of-range amount changes nothing
+            self.amounts[index] = expense.amount_paise
+            
+            self.daily_totals.add(old_day, self.categories[index], -old_amount)
+            self.daily_totals.add(expense.day, category_code, expense.amount_paise)
+            self.days[index] = expense.day
+            self.categories[index] = category_code
+            self.description_ids[index] = self._intern_description(expense.description)
+            self._date_strings.setdefault(expense.day, expense.date)
+            
+            if expense.day != old_day:
+                self._rebuild_indexes()
+    
+    def _rebuild_indexes(self):
+        """Rebuild the month and date-sorted indexes from the columns"""
+        self._month_rows = {}
+        for index, day in enumerate(self.days):
+            month = self.date_string(day)[:7]
+            month_rows = self._month_rows.get(month)
+            if month_rows is None:
+                month_rows = self._month_rows[month] = array("L")
+            month_rows.append(index)
+        
+        # sorted() is stable, so equal days keep insertion order
+        order = sorted(range(len(self.days)), key=self.days.__getitem__)
+        self._sorted_rows = array("L", order)
+        self._sorted_days = array("l", map(self.days.__getitem__, order))
+    
+    def _intern_description(self, description):
+        """Return the pool id for description, adding it if new"""
+        description_id = self._pool_ids.get(description)
+        if description_id is None:
+            description_id = len(self._pool)
+            self._pool.append(description)
+            self._pool_ids[description] = description_id
+        return description_id
+    
+    def date_string(self, day):
+        """Convert a day ordinal back to YYYY-MM-DD"""
+        date_str = self._date_strings.get(day)
+        if date_str is None:
+            date_str = datetime.date.fromordinal(day).isoformat()
+            self._date_strings[day] = date_str
+        return date_str
+    
+    def description(self, index):
+        """Description of the row at index"""
+        return self._pool[self.description_ids[index]]
+    
+    def __len__(self):
+        return len(self.amounts)
+    
+    def __iter__(self):
+        for index in range(len(self.amounts)):
+            yield ExpenseRow(self, index)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ExpenseRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("expense index out of range")
+        return ExpenseRow(self, index)
+    
+    # Aggregations
+    
+    def category_totals(self):
+        """
+        Total paise per category
+        
+        Returns:
+            dict: Category name -> total paise (only categories in use)
+        """
+        totals = {}
+        for code in sorted(set(self.categories)):
+            totals[Expense.CATEGORIES[code]] = sum(compress(self.amounts, map(code.__eq__, self.categories)))
+        return totals
+    
+    def month_rows(self, month):
+        """
+        Indexes of rows in a month
+        
+        Args:
+            month (str): Month in YYYY-MM format
+        
+        Returns:
+            array: Row indexes in insertion order (empty if none)
+        """
+        return self._month_rows.get(month, array("L"))
+    
+    def months(self):
+        """Months (YYYY-MM) that have at least one row"""
+        return list(self._month_rows)
+    
+    def rows_between(self, start_day, end_day):
+        """
+        Indexes of rows dated within [start_day, end_day]
+        
+        Args:
+            start_day (int): First day ordinal (inclusive)
+            end_day (int): Last day ordinal (inclusive)
+        
+        Returns:
+            array: Row indexes in date order
+        """
+        low = bisect_left(self._sorted_days, start_day)
+        high = bisect_right(self._sorted_days, end_day)
+        return self._sorted_rows[low:high]
+
+class ExpenseRow:
+    """Read-only view of one ExpenseTable row that behaves like an Expense"""
+    
+    __slots__ = ("_table", "_index")
+    
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+    
+    @property
+    def amount_paise(self):
+        return self._table.amounts[self._index]
+    
+    @property
+    def amount(self):
+        """Amount in rupees (display only; arithmetic uses amount_paise)"""
+        return self._table.amounts[self._index] / 100
+    
+    @property
+    def category(self):
+        return Expense.CATEGORIES[self._table.categories[self._index]]
+    
+    @property
+    def day(self):
+        return self._table.days[self._index]
+    
+    @property
+    def date(self):
+        return self._table.date_string(self._table.days[self._index])
+    
+    @property
+    def description(self):
+        return self._table.description(self._index)
+    
+    @property
+    def created_at(self):
+        return datetime.datetime.fromtimestamp(self._table.created[self._index])
+    
+    def to_dict(self):
+        """Convert expense to dictionary for CSV storage"""
+        return {
+            "date": self.date,
+            "category": self.category,
+            "amount": self.amount,
+            "description": self.description,
+            "created_at": self.created_at.isoformat()
+        }
+    
+    def __str__(self):
+        """String representation of expense"""
+        return f"[{self.date}] {self.category}: ₹{paise_to_str(self.amount_paise)} - {self.description}"
+    
+    def __repr__(self):
+        """Detailed representation"""
+        return f"Expense(amount={self.amount}, category='{self.category}', date='{self.date}')"
\ No newline at end of file
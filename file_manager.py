@@ -4,20 +4,202 @@ Handles CSV file operations for data persistence
 """
 
 import csv
+import io
+import json
+import mmap
 import os
+import re
 import shutil
-from datetime import datetime
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
 from expense import Expense
+from snapshot import ExpenseSnapshot, MappedSnapshot
+from partitioned_storage import PartitionedStorage
+from sqlite_storage import SQLiteStorage
+from utils import month_day_range, paise_to_str, parse_date, to_paise
 
 class FileManager:
-    """Manages all file operations for expense data"""
+    """
+    Manages all file operations for expense data
     
-    def __init__(self, data_folder="data"):
-        """Initialize file manager with data folder"""
+    Storage is pluggable: the "csv" backend keeps expenses in a CSV file
+    with a write-ahead log, the "sqlite" backend in an indexed database
+    (SQLiteStorage) and the "partitioned" backend in one CSV file per
+    month (PartitionedStorage). Callers use the same methods either way:
+    load, iter_expenses, load_month, summarize, save_expenses,
+    append_expenses and the backup methods. migrate() converts between
+    backends.
+    """
+    
+    # Storage backends; the data folder's storage.json names the default
+    STORAGE_BACKENDS = ("csv", "sqlite", "partitioned")
+    
+    # CSV columns used by the expenses file and write-ahead log rows
+    FIELDNAMES = ["Date", "Category", "Amount", "Description"]
+    
+    # Journal size (bytes) past which it is folded into the expenses file
+    JOURNAL_COMPACT_THRESHOLD = 1024 * 1024
+    
+    # Number of delta backups taken before a fresh full snapshot
+    BACKUP_BASE_INTERVAL = 20
+    
+    # Minimum time between the automatic backups taken by save_expenses
+    BACKUP_MIN_INTERVAL = timedelta(minutes=10)
+    
+    # Backup retention tiers as (maximum age, granularity): keep every
+    # backup from the last hour, one per hour for a day, one per day for
+    # a month and one per month after that
+    BACKUP_RETENTION = [
+        (timedelta(hours=1), "all"),
+        (timedelta(days=1), "hour"),
+        (timedelta(days=30), "day"),
+        (None, "month")
+    ]
+    
+    # strftime patterns identifying the retention bucket of a backup
+    RETENTION_BUCKETS = {"hour": "%Y%m%d%H", "day": "%Y%m%d", "month": "%Y%m"}
+    
+    BACKUP_NAME_PATTERN = re.compile(r"^expenses_backup_(\d{8}_\d{6})(?:_(\d{6}))?")
+    
+    # Unverified expenses files at least this large are parsed in parallel
+    PARALLEL_PARSE_MIN_BYTES = 16 * 1024 * 1024
+    
+    # Seconds between background autosave flushes
+    AUTOSAVE_INTERVAL = 5.0
+    
+    def __init__(self, data_folder="data", use_journal=False,
+                 journal_compact_threshold=JOURNAL_COMPACT_THRESHOLD,
+                 delta_backups=False, backup_base_interval=BACKUP_BASE_INTERVAL,
+                 backup_retention=BACKUP_RETENTION, backup_on_save=True,
+                 backup_min_interval=BACKUP_MIN_INTERVAL, backend=None,
+                 use_snapshot=True, parse_workers=None):
+        """
+        Initialize file manager with data folder
+        
+        Args:
+            data_folder (str): Folder holding expense data and backups
+            use_journal (bool): Record adds and clears in a write-ahead
+                log instead of rewriting the expenses file each time
+            journal_compact_threshold (int): Journal size in bytes that
+                triggers compaction into the expenses file
+            delta_backups (bool): Store only the rows added since the
+                previous backup instead of a full copy each time
+            backup_base_interval (int): Delta backups taken before the
+                next full snapshot
+            backup_retention (list): Retention tiers applied after each
+                backup, or None to keep every backup
+            backup_on_save (bool): Back up the expenses file before saving
+            backup_min_interval (timedelta): Skip the save-time backup if
+                the newest backup is younger than this (None: every save)
+            backend (str): "csv", "sqlite" or "partitioned" (default: the backend
+                recorded in storage.json by migrate(), else "csv")
+            use_snapshot (bool): Keep a binary columnar snapshot of the
+                expenses file for fast startup (csv backend)
+            parse_workers (int): Processes that parse and validate large
+                expenses files (default: number of cores; 1 disables)
+        """
         self.data_folder = data_folder
         self.expenses_file = os.path.join(data_folder, "expenses.csv")
+        self.journal_file = os.path.join(data_folder, "expenses.journal")
+        self.meta_file = os.path.join(data_folder, "expenses.csv.meta")
+        self.snapshot_file = os.path.join(data_folder, "expenses.snapshot")
+        self.use_snapshot = use_snapshot
+        self.parse_workers = parse_workers or os.cpu_count() or 1
         self.backup_folder = os.path.join(data_folder, "backups")
+        self.backup_index_file = os.path.join(self.backup_folder, "backup_index.json")
+        self.database_file = os.path.join(data_folder, "expenses.db")
+        self.settings_file = os.path.join(data_folder, "storage.json")
+        self.use_journal = use_journal
+        self.journal_compact_threshold = journal_compact_threshold
+        # Sequence number of the last write-ahead log record (read lazily)
+        self._wal_seq = None
+        # (size, mtime_ns) of the expenses file when it last matched its
+        # checksum record, so _is_trusted can skip re-reading it
+        self._verified_file = None
+        self.delta_backups = delta_backups
+        self.backup_base_interval = backup_base_interval
+        self.backup_retention = backup_retention
+        self.backup_on_save = backup_on_save
+        self.backup_min_interval = backup_min_interval
+        # Serializes file writes between the caller and the autosave thread
+        self._io_lock = threading.RLock()
+        self._autosave_thread = None
+        self._autosave_dirty = threading.Event()
+        self._autosave_stop = threading.Event()
         self._ensure_folders_exist()
+        
+        self.backend = backend or self._load_settings().get("backend", "csv")
+        if self.backend not in self.STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {self.backend}")
+        # Backend object for everything but the built-in CSV storage
+        if self.backend == "sqlite":
+            self.store = SQLiteStorage(self.database_file)
+        elif self.backend == "partitioned":
+            self.store = PartitionedStorage(data_folder, self._atomic_write)
+        else:
+            self.store = None
+    
+    @property
+    def incremental_writes(self):
+        """True if adds and clears can be persisted without a full save"""
+        return self.use_journal or self.store is not None
+    
+    @property
+    def row_writes(self):
+        """True if single edits and deletes can be persisted without a full save"""
+        return hasattr(self.store, "delete_row")
+    
+    def _load_settings(self):
+        """Load storage.json, or {} if missing or unreadable"""
+        try:
+            with open(self.settings_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+    
+    def close(self):
+        """Release the storage backend (e.g. the SQLite connection)"""
+        if self.store is not None:
+            self.store.close()
+    
+    def migrate(self, backend, expenses=None):
+        """
+        Copy all expenses to another backend and make it the default
+        
+        The old backend's files are left in place as a fallback.
+        
+        Args:
+            backend (str): Target backend (one of STORAGE_BACKENDS)
+            expenses (iterable): Expenses to store (default: everything
+                stored by this backend)
+        
+        Returns:
+            FileManager: Manager for the target backend (same options),
+                or None on failure
+        """
+        try:
+            if expenses is None:
+                expenses = list(self.iter_expenses())
+            
+            target = FileManager(
+                self.data_folder, self.use_journal, self.journal_compact_threshold,
+                self.delta_backups, self.backup_base_interval, self.backup_retention,
+                self.backup_on_save, self.backup_min_interval, backend, self.use_snapshot,
+                self.parse_workers
+            )
+            if not target.save_expenses(expenses):
+                target.close()
+                return None
+            
+            self._atomic_write(self.settings_file, json.dumps({"backend": backend}).encode("utf-8"))
+            return target
+            
+        except Exception as e:
+            print(f"❌ Error migrating to {backend}: {e}")
+            return None
     
     def _ensure_folders_exist(self):
         """Create necessary folders if they don't exist - FIXED for Windows"""
@@ -62,71 +244,277 @@ class FileManager:
         """
         Save list of expenses to CSV file
         
+        The file is replaced atomically, so a crash leaves either the old
+        or the new contents, never a truncated file.
+        
         Args:
             expenses (list): List of Expense objects
         
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            # Create backup before saving
-            self.create_backup()
-            
-            # Prepare data for CSV
-            rows = []
-            for expense in expenses:
-                expense_dict = expense.to_dict()
-                rows.append({
-                    "Date": expense_dict["date"],
-                    "Category": expense_dict["category"],
-                    "Amount": expense_dict["amount"],
-                    "Description": expense_dict["description"]
-                })
-            
-            # Write to CSV
-            with open(self.expenses_file, "w", newline="", encoding="utf-8") as file:
-                fieldnames = ["Date", "Category", "Amount", "Description"]
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
+        with self._io_lock:
+            try:
+                if self.store is not None:
+                    # One SQLite transaction, or only the changed partitions
+                    self.store.save_expenses(expenses)
+                    return True
+                
+                # Saves are atomic, so backups are history, not crash insurance
+                self.backup_if_due()
+                
+                # Prepare data for CSV
+                rows = [self._expense_to_row(expense) for expense in expenses]
+                buffer = io.StringIO(newline="")
+                writer = csv.DictWriter(buffer, fieldnames=self.FIELDNAMES)
                 writer.writeheader()
                 writer.writerows(rows)
+                data = buffer.getvalue().encode("utf-8")
+                
+                # Record a checksum so the next load can skip re-validation.
+                # It is written first: if the replace below never happens
+                # the checksum does not match and the whole log is replayed
+                # onto the old file.
+                wal_seq = self._last_wal_seq()
+                crc, generation = self._rewrite_generation(data)
+                self._save_meta({
+                    "size": len(data),
+                    "crc32": crc,
+                    "rows": len(rows),
+                    "wal_seq": wal_seq,
+                    "generation": generation
+                })
+                self._atomic_write(self.expenses_file, data)
+                self._remember_verified()
+                
+                if self.use_snapshot:
+                    self._save_snapshot(expenses, wal_seq)
+                
+                # Every logged change is now part of the expenses file
+                self._remove_journal()
+                
+                return True
+                
+            except Exception as e:
+                print(f"❌ Error saving expenses: {e}")
+                return False
+    
+    def _rewrite_generation(self, data):
+        """
+        CRC32 and rewrite generation for new expenses file contents
+        
+        The generation changes only when the previously recorded bytes
+        are not an unchanged prefix of data, i.e. when rows were edited
+        or removed rather than only appended. Delta backups compare it
+        instead of re-reading the file.
+        
+        Args:
+            data (bytes): New expenses file contents
+        
+        Returns:
+            tuple: (crc32 of data, generation)
+        """
+        meta = self._load_meta()
+        if meta is not None and meta.get("generation") is not None and len(data) >= meta["size"]:
+            prefix = memoryview(data)[:meta["size"]]
+            prefix_crc = zlib.crc32(prefix)
+            if prefix_crc == meta["crc32"]:
+                return zlib.crc32(memoryview(data)[meta["size"]:], prefix_crc), meta["generation"]
+        return zlib.crc32(data), self._new_generation()
+    
+    def _new_generation(self):
+        """Generation for a rewritten expenses file (unique per rewrite)"""
+        return time.time_ns()
+    
+    def _atomic_write(self, path, data):
+        """
+        Replace a file's contents atomically
+        
+        The data goes to a temporary file in the same folder, is fsynced
+        and renamed over the target; the folder is then fsynced so the
+        rename itself survives a power cut. The file keeps the target's
+        permissions (a new file gets the umask default, as with open()).
+        
+        Args:
+            path (str): File to replace
+            data (bytes): New contents
+        """
+        folder = os.path.dirname(path) or "."
+        handle, temp_path = self._create_temp(path)
+        try:
+            try:
+                os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        try:
+            folder_handle = os.open(folder, os.O_RDONLY)
+        except OSError:
+            # Folders cannot be opened (or fsynced) on Windows
+            return
+        try:
+            os.fsync(folder_handle)
+        finally:
+            os.close(folder_handle)
+    
+    def _create_temp(self, path):
+        """
+        Create a uniquely named temporary file next to a target file
+        
+        Like tempfile.mkstemp, but created 0666 so the kernel applies the
+        process umask, as open() does for a new file.
+        
+        Args:
+            path (str): File the temporary file will replace
+        
+        Returns:
+            tuple: (file descriptor, temporary file path)
+        """
+        folder = os.path.dirname(path) or "."
+        flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+        while True:
+            temp_path = os.path.join(folder, f".{os.path.basename(path)}.{os.urandom(4).hex()}.tmp")
+            try:
+                return os.open(temp_path, flags, 0o666), temp_path
+            except FileExistsError:
+                continue
+    
+    def backup_if_due(self):
+        """
+        Take the save-time backup unless it is disabled or throttled
+        
+        Returns:
+            str: Path of the new backup, or None if none was taken
+        """
+        if not self.backup_on_save:
+            return None
+        
+        if self.backup_min_interval:
+            entries = self._load_backup_index()["entries"]
+            newest = self._backup_time(entries[-1]["filename"]) if entries else None
+            if newest is not None and datetime.now() - newest < self.backup_min_interval:
+                return None
+        
+        return self.create_backup()
+    
+    def start_autosave(self, snapshot, interval=AUTOSAVE_INTERVAL):
+        """
+        Start a background writer that saves changes behind the caller
+        
+        Changes are only marked with mark_dirty(); the writer saves at
+        most once every interval seconds however many changes arrived,
+        and stop_autosave() performs the final flush.
+        
+        Args:
+            snapshot (callable): Returns a consistent copy of the
+                expenses to save; called on the writer thread
+            interval (float): Seconds between flushes
+        """
+        if self._autosave_thread is not None or self.store is not None:
+            # Backend writes are already small and incremental
+            return
+        
+        self._autosave_snapshot = snapshot
+        self._autosave_interval = interval
+        self._autosave_stop.clear()
+        self._autosave_thread = threading.Thread(target=self._autosave_loop, name="expense-autosave", daemon=True)
+        self._autosave_thread.start()
+    
+    @property
+    def autosave_enabled(self):
+        """True while the background writer is running"""
+        return self._autosave_thread is not None
+    
+    def mark_dirty(self):
+        """Record that there are changes for the next autosave flush"""
+        self._autosave_dirty.set()
+    
+    def _autosave_loop(self):
+        """Writer thread: flush pending changes every interval"""
+        while not self._autosave_stop.wait(self._autosave_interval):
+            self.flush()
+    
+    def flush(self):
+        """
+        Save pending autosave changes now
+        
+        Returns:
+            bool: True if successful or nothing was pending
+        """
+        with self._io_lock:
+            if not self._autosave_dirty.is_set():
+                return True
             
-            return True
+            # Cleared before the snapshot, so changes made while saving
+            # are picked up by the next flush
+            self._autosave_dirty.clear()
+            if self.save_expenses(self._autosave_snapshot()):
+                return True
             
-        except Exception as e:
-            print(f"❌ Error saving expenses: {e}")
+            self._autosave_dirty.set()
             return False
     
-    def load_expenses(self):
+    def stop_autosave(self):
+        """
+        Stop the background writer and flush whatever is still pending
+        
+        Returns:
+            bool: True if the final flush succeeded
+        """
+        if self._autosave_thread is None:
+            return True
+        
+        self._autosave_stop.set()
+        self._autosave_thread.join()
+        self._autosave_thread = None
+        return self.flush()
+    
+    def load_expenses(self, expenses=None):
         """
-        Load expenses from CSV file
+        Load expenses from storage
+        
+        Args:
+            expenses: Collection with an append() method to load into
+                (default: a new list)
         
         Returns:
-            list: List of Expense objects
+            list: List of Expense objects (or the given collection)
         """
-        expenses = []
+        if expenses is None:
+            expenses = []
         
         try:
-            # Check if file exists
-            if not os.path.exists(self.expenses_file):
+            # Check if there is any data
+            if self.store is not None:
+                has_data = self.store.count() > 0
+            else:
+                has_data = os.path.exists(self.expenses_file) or os.path.exists(self.journal_file)
+            if not has_data:
                 print("ℹ️  No expense data found. Starting fresh.")
                 return expenses
             
-            # Read from CSV
-            with open(self.expenses_file, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                
-                for row in reader:
-                    try:
-                        expense = Expense(
-                            amount=row["Amount"],
-                            category=row["Category"],
-                            date=row["Date"],
-                            description=row["Description"]
-                        )
-                        expenses.append(expense)
-                    except ValueError as e:
-                        print(f"⚠️  Skipping invalid row: {e}")
-                        continue
+            snapshot = self._load_snapshot() if self.store is None else None
+            if snapshot is not None:
+                # Columns straight from the snapshot, then the write-ahead log
+                cleared, pending = self._pending_wal_rows(snapshot.wal_seq)
+                if not cleared:
+                    snapshot.load_into(expenses)
+                rows = (dict(zip(self.FIELDNAMES, row)) for row in pending)
+                for expense in self._filter_rows(rows, None, None, None):
+                    expenses.append(expense)
+            else:
+                # Read from CSV, then replay the write-ahead log
+                for expense in self.iter_expenses():
+                    expenses.append(expense)
             
             print(f"✅ Loaded {len(expenses)} expenses from file")
             
@@ -135,47 +523,1207 @@ class FileManager:
         
         return expenses
     
-    def create_backup(self):
-        """Create a backup of the expenses file"""
+    def iter_expenses(self, start_date=None, end_date=None, categories=None):
+        """
+        Stream expenses from the expenses file and write-ahead log
+        
+        Log records already contained in the expenses file are skipped;
+        a logged clear hides everything recorded before it. Filters are
+        applied to the raw CSV fields before an Expense is built, so rows
+        that do not match cost no validation or memory.
+        
+        Args:
+            start_date (str): Earliest date to include (YYYY-MM-DD)
+            end_date (str): Latest date to include (YYYY-MM-DD)
+            categories (iterable): Categories to include (default: all)
+        
+        Yields:
+            Expense: Matching expenses in file order
+        """
+        if self.store is not None:
+            # Filters are pushed down (indexed SQL or partition pruning)
+            yield from self.store.iter_expenses(
+                parse_date(start_date)[0] if start_date else None,
+                parse_date(end_date)[0] if end_date else None,
+                categories
+            )
+            return
+        
+        if categories is not None:
+            categories = set(categories)
+        start_day = parse_date(start_date)[1] if start_date else None
+        end_day = parse_date(end_date)[1] if end_date else None
+        
+        exists = os.path.exists(self.expenses_file)
+        trusted = exists and self._is_trusted(self.expenses_file)
+        cleared, pending = self._pending_wal_rows(self._applied_wal_seq(trusted))
+        
+        if exists and not cleared:
+            if trusted:
+                yield from self._iter_trusted_rows(self.expenses_file, start_day, end_day, categories)
+            elif self.parse_workers > 1 and os.path.getsize(self.expenses_file) >= self.PARALLEL_PARSE_MIN_BYTES:
+                yield from self._iter_rows_parallel(self.expenses_file, start_day, end_day, categories)
+            else:
+                yield from self._iter_rows(self.expenses_file, None, start_day, end_day, categories)
+        
+        if pending:
+            rows = (dict(zip(self.FIELDNAMES, row)) for row in pending)
+            yield from self._filter_rows(rows, start_day, end_day, categories)
+    
+    def load_month(self, month, expenses=None):
+        """
+        Load the expenses of one month
+        
+        With the partitioned backend only that month's file is read.
+        
+        Args:
+            month (str): Month in YYYY-MM format
+            expenses: Collection with an append() method to load into
+                (default: a new list)
+        
+        Returns:
+            list: Expenses of the month (or the given collection)
+        """
+        if expenses is None:
+            expenses = []
+        
+        if isinstance(self.store, PartitionedStorage):
+            month_expenses = self.store.iter_month(month)
+        else:
+            first_day, last_day = month_day_range(month)
+            month_expenses = self.iter_expenses(
+                date.fromordinal(first_day).isoformat(),
+                date.fromordinal(last_day).isoformat()
+            )
+        for expense in month_expenses:
+            expenses.append(expense)
+        return expenses
+    
+    def summarize(self, start_date=None, end_date=None, categories=None):
+        """
+        Aggregate stored expenses without loading them into memory
+        
+        The sqlite backend runs this as one GROUP BY query. The CSV
+        backend aggregates over the memory-mapped snapshot when it is
+        current, and otherwise streams the file through iter_expenses.
+        
+        Args:
+            start_date (str): Earliest date to include (YYYY-MM-DD)
+            end_date (str): Latest date to include (YYYY-MM-DD)
+            categories (iterable): Categories to include (default: all)
+        
+        Returns:
+            dict: Total (paise), count and per-category totals (paise)
+        """
+        if self.store is not None:
+            return self.store.summarize(
+                parse_date(start_date)[0] if start_date else None,
+                parse_date(end_date)[0] if end_date else None,
+                categories
+            )
+        
+        mapped = self.open_snapshot()
+        if mapped is not None:
+            with mapped:
+                return mapped.summarize(
+                    parse_date(start_date)[1] if start_date else None,
+                    parse_date(end_date)[1] if end_date else None,
+                    categories
+                )
+        
+        total = 0
+        count = 0
+        category_totals = {}
+        
+        for expense in self.iter_expenses(start_date, end_date, categories):
+            total += expense.amount_paise
+            count += 1
+            category_totals[expense.category] = category_totals.get(expense.category, 0) + expense.amount_paise
+        
+        return {
+            "total": total,
+            "count": count,
+            "category_totals": category_totals
+        }
+    
+    def _iter_trusted_rows(self, path, start_day, end_day, categories):
+        """
+        Yield Expense objects from a checksum-verified expenses file
+        
+        Rows are built with Expense.from_trusted, skipping constructor
+        validation and sharing one creation timestamp. A row that does
+        not parse cleanly anyway goes through the normal constructor.
+        
+        Args:
+            path (str): Verified CSV file to read
+            start_day (int): Earliest day ordinal to include, or None
+            end_day (int): Latest day ordinal to include, or None
+            categories (set): Categories to include, or None for all
+        
+        Yields:
+            Expense: Matching expenses
+        """
+        canonical_categories = {category: category for category in Expense.CATEGORIES}
+        created_ts = datetime.now().timestamp()
+        
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader, None)  # header
+            
+            for row in reader:
+                try:
+                    date_str, category, amount, description = row
+                    date_str, day = parse_date(date_str)
+                    category = canonical_categories[category]
+                    # save_expenses writes amounts as "<rupees>.<2 digits>"
+                    if amount[-3:-2] == ".":
+                        amount_paise = int(amount[:-3] + amount[-2:])
+                    else:
+                        amount_paise = to_paise(amount)
+                except (ValueError, KeyError):
+                    # Fall back to full validation (and its error report)
+                    fields = dict(zip(self.FIELDNAMES, row + [None] * len(self.FIELDNAMES)))
+                    yield from self._filter_rows([fields], start_day, end_day, categories)
+                    continue
+                
+                if categories is not None and category not in categories:
+                    continue
+                if start_day is not None and day < start_day:
+                    continue
+                if end_day is not None and day > end_day:
+                    continue
+                
+                yield Expense.from_trusted(amount_paise, category, date_str, day, description, created_ts)
+    
+    def _iter_rows(self, path, fieldnames, start_day, end_day, categories):
+        """
+        Yield Expense objects from a CSV file, skipping invalid rows
+        
+        Args:
+            path (str): CSV file to read
+            fieldnames (list): Column names for files without a header row
+            start_day (int): Earliest day ordinal to include, or None
+            end_day (int): Latest day ordinal to include, or None
+            categories (set): Categories to include, or None for all
+        
+        Yields:
+            Expense: Matching expenses
+        """
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            reader = csv.DictReader(file, fieldnames=fieldnames)
+            yield from self._filter_rows(reader, start_day, end_day, categories)
+    
+    def _iter_rows_parallel(self, path, start_day, end_day, categories):
+        """
+        Yield Expense objects from a CSV file parsed by a process pool
+        
+        The file is split into newline-aligned byte ranges, each parsed
+        and validated by a worker that returns plain tuples. Results are
+        consumed in file order, and invalid rows are reported just as
+        _iter_rows reports them.
+        
+        Args:
+            path (str): CSV file with a header row
+            start_day (int): Earliest day ordinal to include, or None
+            end_day (int): Latest day ordinal to include, or None
+            categories (set): Categories to include, or None for all
+        
+        Yields:
+            Expense: Matching expenses
+        """
+        with open(path, "rb") as file:
+            fieldnames = next(csv.reader([file.readline().decode("utf-8")]))
+            data_start = file.tell()
+        
+        # A few ranges per worker keeps them busy when rows are uneven
+        ranges = self._split_csv(path, data_start, self.parse_workers * 4)
+        tasks = [(path, start, end, fieldnames, start_day, end_day, categories) for start, end in ranges]
+        created_ts = datetime.now().timestamp()
+        
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
+            for rows, errors in executor.map(_parse_csv_range, tasks):
+                for message in errors:
+                    print(f"⚠️  Skipping invalid row: {message}")
+                for row in rows:
+                    yield Expense.from_trusted(*row, created_ts)
+    
+    def _split_csv(self, path, start, parts):
+        """
+        Split a CSV file into byte ranges that end on row boundaries
+        
+        A boundary is the byte after a newline that is outside quotes
+        (an even number of quote characters precedes it in the range),
+        so descriptions containing newlines are never cut in half.
+        
+        Args:
+            path (str): CSV file
+            start (int): Offset of the first data row
+            parts (int): Desired number of ranges
+        
+        Returns:
+            list: (start, end) byte offsets in file order
+        """
+        size = os.path.getsize(path)
+        if size <= start:
+            return []
+        
+        step = max((size - start) // parts, 1)
+        bounds = [start]
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            while bounds[-1] + step < size:
+                position = bounds[-1] + step
+                quotes = data[bounds[-1]:position].count(b'"')
+                while True:
+                    newline = data.find(b"\n", position)
+                    if newline == -1:
+                        break
+                    quotes += data[position:newline].count(b'"')
+                    if quotes % 2 == 0:
+                        break
+                    position = newline + 1
+                if newline == -1 or newline + 1 >= size:
+                    break
+                bounds.append(newline + 1)
+        bounds.append(size)
+        return list(zip(bounds, bounds[1:]))
+    
+    @staticmethod
+    def _filter_rows(rows, start_day, end_day, categories, errors=None):
+        """
+        Validate and filter CSV row dictionaries into Expense objects
+        
+        Args:
+            rows (iterable): Row dictionaries keyed by FIELDNAMES
+            start_day (int): Earliest day ordinal to include, or None
+            end_day (int): Latest day ordinal to include, or None
+            categories (set): Categories to include, or None for all
+            errors (list): Collects invalid-row messages instead of
+                printing them (used by parse workers)
+        
+        Yields:
+            Expense: Valid matching expenses
+        """
+        for row in rows:
+            if categories is not None and row["Category"] not in categories:
+                continue
+            if start_day is not None or end_day is not None:
+                # parse_date is cached, so this is a dict lookup for
+                # dates already seen; unparseable rows are reported below
+                try:
+                    _, day = parse_date(row["Date"])
+                except (ValueError, TypeError):
+                    day = None
+                if day is not None:
+                    if start_day is not None and day < start_day:
+                        continue
+                    if end_day is not None and day > end_day:
+                        continue
+            
+            try:
+                expense = Expense(
+                    amount=row["Amount"],
+                    category=row["Category"],
+                    date=row["Date"],
+                    description=row["Description"]
+                )
+            except (ValueError, TypeError, AttributeError) as e:
+                if errors is None:
+                    print(f"⚠️  Skipping invalid row: {e}")
+                else:
+                    errors.append(str(e))
+                continue
+            
+            yield expense
+    
+    def _expense_to_row(self, expense):
+        """Convert an Expense to a CSV row dictionary"""
+        return {
+            "Date": expense.date,
+            "Category": expense.category,
+            "Amount": paise_to_str(expense.amount_paise),
+            "Description": expense.description
+        }
+    
+    def append_expense(self, expense):
+        """
+        Record a single added expense in the write-ahead log
+        
+        The record is flushed and fsynced before returning, so the cost
+        of an add does not depend on how many expenses are stored. The
+        log is compacted into the expenses file once it grows past
+        journal_compact_threshold.
+        
+        Args:
+            expense (Expense): Expense object to append
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.append_expenses([expense])
+    
+    def append_expenses(self, expenses, clear=False):
+        """
+        Record added expenses in the write-ahead log with a single fsync
+        
+        Args:
+            expenses (list): Expense objects to append
+            clear (bool): Log a clear of all earlier expenses first
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if self.store is not None:
+            try:
+                self.store.append_expenses(expenses, clear)
+                return True
+            except Exception as e:
+                print(f"❌ Error appending expense: {e}")
+                return False
+        
+        rows = [list(self._expense_to_row(expense).values()) for expense in expenses]
+        operations = [{"op": "clear"}] if clear else []
+        if len(rows) == 1:
+            operations.append({"op": "add", "row": rows[0]})
+        elif rows:
+            operations.append({"op": "bulk", "rows": rows})
+        return self._append_wal(operations)
+    
+    def delete_row(self, index):
+        """
+        Persist the deletion of one expense (backends with row_writes)
+        
+        Args:
+            index (int): Position of the expense in the loaded table
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
         try:
-            if os.path.exists(self.expenses_file):
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_file = os.path.join(self.backup_folder, f"expenses_backup_{timestamp}.csv")
-                shutil.copy2(self.expenses_file, backup_file)
-                return backup_file
+            self.store.delete_row(index)
+            return True
         except Exception as e:
-            print(f"⚠️  Could not create backup: {e}")
-        
-        return None
+            print(f"❌ Error deleting expense: {e}")
+            return False
     
-    def restore_backup(self, backup_file):
-        """Restore expenses from a backup file"""
+    def update_row(self, index, expense):
+        """
+        Persist the edit of one expense (backends with row_writes)
+        
+        Args:
+            index (int): Position of the expense in the loaded table
+            expense (Expense): New values
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
         try:
-            if os.path.exists(backup_file):
-                shutil.copy2(backup_file, self.expenses_file)
+            self.store.update_row(index, expense)
+            return True
+        except Exception as e:
+            print(f"❌ Error updating expense: {e}")
+            return False
+    
+    def clear_expenses(self):
+        """
+        Record that all expenses were removed
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.append_expenses([], clear=True)
+    
+    def _append_wal(self, operations):
+        """
+        Append operations to the write-ahead log and fsync it
+        
+        Each operation becomes one line: "<seq> <crc32> <json>", where
+        the sequence number increases by one per record and the CRC32
+        covers the sequence number and payload. A record only counts
+        once it is complete and its checksum matches.
+        
+        Args:
+            operations (list): Operation dictionaries ("add", "bulk", "clear")
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        with self._io_lock:
+            try:
+                seq = self._last_wal_seq()
+                lines = []
+                for operation in operations:
+                    seq += 1
+                    lines.append(self._wal_record(seq, operation))
+                
+                with open(self.journal_file, "ab") as file:
+                    file.write(b"".join(lines))
+                    file.flush()
+                    os.fsync(file.fileno())
+                    journal_size = file.tell()
+                self._wal_seq = seq
+                
+                if journal_size >= self.journal_compact_threshold:
+                    return self.compact_journal()
+                
+                return True
+                
+            except Exception as e:
+                print(f"❌ Error appending expense: {e}")
+                return False
+    
+    def _wal_record(self, seq, operation):
+        """Encode one write-ahead log record"""
+        payload = json.dumps(operation, separators=(",", ":"))
+        crc = zlib.crc32(f"{seq} {payload}".encode("utf-8"))
+        return f"{seq} {crc:08x} {payload}\n".encode("utf-8")
+    
+    def _read_wal(self):
+        """
+        Read the valid records of the write-ahead log
+        
+        Reading stops at the first torn, corrupt or out-of-sequence
+        record; anything after it was never acknowledged as written.
+        
+        Returns:
+            tuple: (list of (seq, operation), byte length of the valid part)
+        """
+        if not os.path.exists(self.journal_file):
+            return [], 0
+        
+        with open(self.journal_file, "rb") as file:
+            data = file.read()
+        
+        records = []
+        valid_end = 0
+        for line in data.splitlines(keepends=True):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete record")
+                seq_text, crc_text, payload = line.decode("utf-8").rstrip("\n").split(" ", 2)
+                seq = int(seq_text)
+                if zlib.crc32(f"{seq} {payload}".encode("utf-8")) != int(crc_text, 16):
+                    raise ValueError("checksum mismatch")
+                if records and seq != records[-1][0] + 1:
+                    raise ValueError("sequence gap")
+                operation = json.loads(payload)
+            except (ValueError, UnicodeDecodeError) as e:
+                print(f"⚠️  Ignoring damaged write-ahead log tail ({e})")
+                break
+            records.append((seq, operation))
+            valid_end += len(line)
+        
+        return records, valid_end
+    
+    def _last_wal_seq(self):
+        """
+        Sequence number of the last logged record
+        
+        Read once from the log (or the checksum record after a
+        compaction); a damaged tail is truncated at that point so new
+        records are not appended behind it.
+        """
+        if self._wal_seq is None:
+            records, valid_end = self._read_wal()
+            if os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > valid_end:
+                with open(self.journal_file, "r+b") as file:
+                    file.truncate(valid_end)
+            meta = self._load_meta() or {}
+            self._wal_seq = max(records[-1][0] if records else 0, meta.get("wal_seq") or 0)
+        return self._wal_seq
+    
+    def _applied_wal_seq(self, trusted):
+        """
+        Last write-ahead log record already in the expenses file
+        
+        Args:
+            trusted (bool): Whether the checksum record matches the
+                expenses file; if not, its wal_seq cannot be relied on
+                and every record is replayed (0 is returned)
+        """
+        meta = self._load_meta() if trusted else None
+        return (meta or {}).get("wal_seq") or 0
+    
+    def _pending_wal_rows(self, applied_seq):
+        """
+        Replay the write-ahead log records not yet in the expenses file
+        
+        Args:
+            applied_seq (int): Last record already in the expenses file
+        
+        Returns:
+            tuple: (True if a clear was logged, list of CSV row lists
+                added after the last clear)
+        """
+        records, _ = self._read_wal()
+        
+        cleared = False
+        rows = []
+        for seq, operation in records:
+            if seq <= applied_seq:
+                continue
+            if operation["op"] == "clear":
+                cleared = True
+                rows = []
+            elif operation["op"] == "add":
+                rows.append(operation["row"])
+            elif operation["op"] == "bulk":
+                rows.extend(operation["rows"])
+        return cleared, rows
+    
+    def compact_journal(self):
+        """
+        Fold the write-ahead log into the expenses file
+        
+        Added rows are appended to the end of the expenses file, so
+        compaction costs the size of the log, not of the dataset. Only a
+        logged clear forces the file to be rewritten.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        with self._io_lock:
+            try:
+                if not os.path.exists(self.journal_file):
+                    return True
+                
+                seq = self._last_wal_seq()
+                meta = self._load_meta()
+                size = os.path.getsize(self.expenses_file) if os.path.exists(self.expenses_file) else 0
+                # A size match is not enough: a save that crashed between
+                # the checksum record and the file replace can leave a
+                # same-size file whose rows predate the record's wal_seq
+                in_step = meta is not None and self._is_trusted(self.expenses_file)
+                cleared, rows = self._pending_wal_rows(self._applied_wal_seq(in_step))
+                
+                buffer = io.StringIO(newline="")
+                writer = csv.writer(buffer)
+                if cleared or size == 0:
+                    writer.writerow(self.FIELDNAMES)
+                writer.writerows(rows)
+                pending = buffer.getvalue().encode("utf-8")
+                
+                if cleared or size == 0:
+                    self._save_meta({
+                        "size": len(pending),
+                        "crc32": zlib.crc32(pending),
+                        "rows": len(rows),
+                        "wal_seq": seq,
+                        "generation": self._new_generation()
+                    })
+                    self._atomic_write(self.expenses_file, pending)
+                    self._remember_verified()
+                elif pending:
+                    # CRC32 can be extended, so the checksum stays valid
+                    # without re-reading the expenses file. It is saved
+                    # before appending; a crash in between leaves a
+                    # mismatch, which replays the whole log on load.
+                    if in_step:
+                        meta.update(size=size + len(pending), crc32=zlib.crc32(pending, meta["crc32"]), rows=None, wal_seq=seq)
+                        self._save_meta(meta)
+                    else:
+                        self._remove_meta()
+                    
+                    with open(self.expenses_file, "ab") as file:
+                        file.write(pending)
+                        file.flush()
+                        os.fsync(file.fileno())
+                    if in_step:
+                        self._remember_verified()
+                
+                self._remove_journal()
                 return True
+                
+            except Exception as e:
+                print(f"❌ Error compacting journal: {e}")
+                return False
+    
+    def _load_meta(self):
+        """Load the expenses file checksum record, or None"""
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+    
+    def _save_meta(self, meta):
+        """Write the expenses file checksum record"""
+        self._verified_file = None
+        self._atomic_write(self.meta_file, json.dumps(meta).encode("utf-8"))
+    
+    def _remove_meta(self):
+        """Delete the checksum record, forcing validation on next load"""
+        self._verified_file = None
+        if os.path.exists(self.meta_file):
+            os.remove(self.meta_file)
+    
+    def _is_trusted(self, path):
+        """
+        Check whether path is an expenses file written by this app
+        
+        The file is trusted when its size and CRC32 match the record
+        written by save_expenses; the checksum is computed in large
+        chunks, which is far cheaper than validating every row. Once
+        verified (or written by this process) the file is not re-read
+        while its size and mtime stay the same.
+        
+        Returns:
+            bool: True if rows can be loaded without re-validation
+        """
+        meta = self._load_meta()
+        if meta is None:
+            return False
+        stat = os.stat(path)
+        if stat.st_size != meta["size"]:
+            return False
+        if path == self.expenses_file and self._verified_file == (stat.st_size, stat.st_mtime_ns):
+            return True
+        
+        crc = 0
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                crc = zlib.crc32(chunk, crc)
+        if crc != meta["crc32"]:
+            return False
+        if path == self.expenses_file:
+            self._verified_file = (stat.st_size, stat.st_mtime_ns)
+        return True
+    
+    def _remember_verified(self):
+        """Record that the expenses file now matches its checksum record"""
+        stat = os.stat(self.expenses_file)
+        self._verified_file = (stat.st_size, stat.st_mtime_ns)
+    
+    def _save_snapshot(self, expenses, wal_seq):
+        """
+        Write the binary snapshot of the just-saved expenses file
+        
+        A snapshot that cannot be written is removed rather than left
+        stale; loading then falls back to the CSV.
+        """
+        try:
+            stat = os.stat(self.expenses_file)
+            snapshot = ExpenseSnapshot.from_expenses(expenses, wal_seq)
+            self._atomic_write(self.snapshot_file, snapshot.to_bytes(stat.st_size, stat.st_mtime_ns))
         except Exception as e:
-            print(f"❌ Error restoring backup: {e}")
+            print(f"⚠️  Could not write snapshot: {e}")
+            if os.path.exists(self.snapshot_file):
+                os.remove(self.snapshot_file)
+    
+    def _load_snapshot(self):
+        """
+        Load the binary snapshot if it is fresh and intact
+        
+        Fresh means the expenses file still has the size and mtime it
+        had when the snapshot was written; any later rewrite, compaction
+        or restore makes the snapshot stale.
+        
+        Returns:
+            ExpenseSnapshot: The snapshot, or None to read the CSV instead
+        """
+        if not self.use_snapshot or not os.path.exists(self.snapshot_file) or not os.path.exists(self.expenses_file):
+            return None
         
-        return False
+        try:
+            with open(self.snapshot_file, "rb") as file:
+                header = ExpenseSnapshot.read_header(file.read(ExpenseSnapshot.HEADER.size))
+                stat = os.stat(self.expenses_file)
+                if (header["source_size"], header["source_mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+                    return None
+                file.seek(0)
+                snapshot, _ = ExpenseSnapshot.from_bytes(file.read())
+            return snapshot
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring expense snapshot: {e}")
+            return None
+    
+    def open_snapshot(self):
+        """
+        Memory-map the binary snapshot for read-only aggregation
+        
+        Several processes mapping the same data folder share the page
+        cache instead of each loading its own copy. The caller must
+        close() the result (or use it in a with block).
+        
+        Returns:
+            MappedSnapshot: Mapped view, or None if there is no fresh
+                snapshot, the write-ahead log holds newer changes, or
+                the machine is not little-endian
+        """
+        if not self.use_snapshot or self.store is not None:
+            return None
+        if not os.path.exists(self.snapshot_file) or not os.path.exists(self.expenses_file):
+            return None
+        
+        try:
+            mapped = MappedSnapshot(self.snapshot_file)
+        except (OSError, ValueError, BufferError):
+            return None
+        
+        stat = os.stat(self.expenses_file)
+        header = mapped.header
+        cleared, pending = self._pending_wal_rows(mapped.wal_seq)
+        if cleared or pending or (header["source_size"], header["source_mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+            mapped.close()
+            return None
+        return mapped
+    
+    def _remove_journal(self):
+        """Delete the journal file if present"""
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+    
+    def create_backup(self, full=False):
+        """
+        Create a backup of the expenses file
+        
+        Pending write-ahead log records are compacted into the file
+        first, so the backup holds every acknowledged add. With delta
+        backups enabled, only the bytes appended since the previous
+        backup are written, and a full snapshot is taken every
+        backup_base_interval backups or whenever the file was rewritten.
+        
+        Args:
+            full (bool): Force a full snapshot
+        
+        Returns:
+            str: Path of the backup file, or None on failure
+        """
+        with self._io_lock:
+            try:
+                if self.store is not None:
+                    return self._backup_store()
+                
+                # Journaled adds belong in the backup (and restoring it
+                # removes the journal); folding them in costs O(journal)
+                self.compact_journal()
+                
+                if os.path.exists(self.expenses_file):
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+                    index = self._load_backup_index()
+                    size = os.path.getsize(self.expenses_file)
+                    
+                    meta = self._load_meta()
+                    # The generation only describes the file if the sizes agree
+                    generation = meta.get("generation") if meta is not None and meta["size"] == size else None
+                    
+                    if not full and self.delta_backups and self._can_take_delta(index, size, generation):
+                        if size == index["source_size"]:
+                            # Nothing changed since the last backup
+                            return os.path.join(self.backup_folder, index["entries"][-1]["filename"])
+                        
+                        backup_name = f"expenses_backup_{timestamp}.delta.csv"
+                        backup_file = os.path.join(self.backup_folder, backup_name)
+                        with open(self.expenses_file, "rb") as source:
+                            source.seek(index["source_size"])
+                            delta = source.read(size - index["source_size"])
+                        with open(backup_file, "wb") as target:
+                            target.write(delta)
+                        index["entries"].append({"filename": backup_name, "kind": "delta", "size": len(delta)})
+                        index["deltas_since_base"] += 1
+                    else:
+                        backup_name = f"expenses_backup_{timestamp}.csv"
+                        backup_file = os.path.join(self.backup_folder, backup_name)
+                        shutil.copy2(self.expenses_file, backup_file)
+                        index["entries"].append({"filename": backup_name, "kind": "full", "size": size})
+                        index["deltas_since_base"] = 0
+                    
+                    index["source_size"] = size
+                    index["source_generation"] = generation
+                    if self.backup_retention:
+                        self._prune_backup_entries(index)
+                    self._save_backup_index(index)
+                    
+                    # Pruning may have folded older backups into this one
+                    return os.path.join(self.backup_folder, index["entries"][-1]["filename"])
+            except Exception as e:
+                print(f"⚠️  Could not create backup: {e}")
+            
+            return None
+    
+    def _backup_store(self):
+        """
+        Back up a storage backend as CSV
+        
+        Backups stay in the CSV format whatever the backend, so they can
+        be listed, pruned and restored the same way. Backends that track
+        row ids and a rewrite generation (SQLite) get delta backups of
+        the rows added since the previous backup; the index then records
+        the last backed-up row id as its source size.
+        
+        Returns:
+            str: Path of the backup file
+        """
+        index = self._load_backup_index()
+        generation = self.store.generation() if hasattr(self.store, "generation") else None
+        last_id = self.store.last_id() if generation is not None else 0
+        delta = self.delta_backups and self._can_take_delta(index, last_id, generation)
+        if delta and last_id == index["source_size"]:
+            # Nothing added since the last backup
+            return os.path.join(self.backup_folder, index["entries"][-1]["filename"])
+        
+        buffer = io.StringIO(newline="")
+        writer = csv.DictWriter(buffer, fieldnames=self.FIELDNAMES)
+        if delta:
+            expenses = self.store.iter_expenses(after_id=index["source_size"])
+        else:
+            writer.writeheader()
+            expenses = self.store.iter_expenses()
+        writer.writerows(self._expense_to_row(expense) for expense in expenses)
+        data = buffer.getvalue().encode("utf-8")
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        backup_name = f"expenses_backup_{timestamp}.delta.csv" if delta else f"expenses_backup_{timestamp}.csv"
+        with open(os.path.join(self.backup_folder, backup_name), "wb") as file:
+            file.write(data)
+        
+        if delta:
+            index["entries"].append({"filename": backup_name, "kind": "delta", "size": len(data)})
+            index["deltas_since_base"] += 1
+        else:
+            index["entries"].append({"filename": backup_name, "kind": "full", "size": len(data)})
+            index["deltas_since_base"] = 0
+        index["source_size"] = last_id
+        # None for backends without a generation: never chain deltas
+        index["source_generation"] = generation
+        if self.backup_retention:
+            self._prune_backup_entries(index)
+        self._save_backup_index(index)
+        return os.path.join(self.backup_folder, index["entries"][-1]["filename"])
+    
+    def _can_take_delta(self, index, size, generation):
+        """
+        Check whether the expenses file only grew since the last backup
+        
+        Every backed-up byte must be unchanged. Saves and compactions
+        keep the checksum record's rewrite generation while they only
+        append, so an equal generation and a file no smaller than before
+        prove it without reading the file.
+        
+        Args:
+            index (dict): Backup index
+            size (int): Current size of the expenses file (for a
+                backend: its last row id)
+            generation (int): Rewrite generation of the file, or None
+        """
+        if not index["entries"] or index["deltas_since_base"] >= self.backup_base_interval:
+            return False
+        if generation is None or index.get("source_generation") != generation:
+            return False
+        if size < index["source_size"]:
+            return False
+        
+        last = os.path.join(self.backup_folder, index["entries"][-1]["filename"])
+        return os.path.exists(last)
+    
+    def _load_backup_index(self):
+        """
+        Load the backup index and reconcile it with the backup folder
+        
+        An interrupted prune is finished first, and merged files left by
+        a prune that crashed before recording its pending step are
+        deleted. Backup files missing from the index (e.g. copies made by
+        older versions) are then adopted as full snapshots, and entries
+        whose file has been deleted are dropped.
+        
+        Returns:
+            dict: Backup index
+        """
+        try:
+            with open(self.backup_index_file, "r", encoding="utf-8") as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            index = {"entries": [], "source_size": 0, "source_generation": None, "deltas_since_base": 0}
+        
+        if index.get("pending"):
+            # A prune was interrupted after recording its new chain
+            self._finish_pending_prune(index)
+        
+        # No pending record mentions a .merge file any more: the old
+        # chain is still complete, so these are orphans
+        names = os.listdir(self.backup_folder)
+        for name in names:
+            if name.endswith(".merge"):
+                os.remove(os.path.join(self.backup_folder, name))
+        
+        on_disk = {name for name in names if name.endswith(".csv")}
+        known = {entry["filename"] for entry in index["entries"]}
+        
+        if on_disk != known:
+            entries = [entry for entry in index["entries"] if entry["filename"] in on_disk]
+            for name in on_disk - known:
+                entries.append({
+                    "filename": name,
+                    "kind": "delta" if name.endswith(".delta.csv") else "full",
+                    "size": os.path.getsize(os.path.join(self.backup_folder, name))
+                })
+            entries.sort(key=lambda entry: entry["filename"])
+            
+            # The chain can no longer be trusted to end at the last backup
+            if not entries or not known or entries[-1]["filename"] not in known:
+                index["source_generation"] = None
+            index["entries"] = entries
+        
+        return index
+    
+    def _save_backup_index(self, index):
+        """Write the backup index"""
+        self._atomic_write(self.backup_index_file, json.dumps(index, indent=2).encode("utf-8"))
+    
+    def _backup_time(self, filename):
+        """Parse the creation time encoded in a backup filename"""
+        match = self.BACKUP_NAME_PATTERN.match(filename)
+        if not match:
+            return None
+        stamp = match.group(1) + "_" + (match.group(2) or "000000")
+        return datetime.strptime(stamp, "%Y%m%d_%H%M%S_%f")
+    
+    def prune_backups(self, now=None):
+        """
+        Apply the retention policy to the backup folder
+        
+        Args:
+            now (datetime): Reference time for backup ages (default: now)
+        
+        Returns:
+            int: Number of backup files removed
+        """
+        try:
+            index = self._load_backup_index()
+            removed = self._prune_backup_entries(index, now)
+            self._save_backup_index(index)
+            return removed
+        except Exception as e:
+            print(f"⚠️  Could not prune backups: {e}")
+            return 0
+    
+    def _prune_backup_entries(self, index, now=None):
+        """
+        Prune and merge backups in a single chronological pass
+        
+        Within each retention bucket only the newest backup is kept. The
+        contents of pruned backups are folded into the next kept backup,
+        so every remaining delta can still be restored; a delta that
+        absorbs a pruned full snapshot becomes a full snapshot itself.
+        
+        Args:
+            index (dict): Backup index, updated in place
+            now (datetime): Reference time for backup ages
+        
+        Returns:
+            int: Number of backup files removed
+        """
+        now = now or datetime.now()
+        entries = index["entries"]
+        
+        # Walk newest to oldest, keeping the first backup seen per bucket
+        keep = set()
+        seen_buckets = set()
+        for position in range(len(entries) - 1, -1, -1):
+            created = self._backup_time(entries[position]["filename"])
+            if created is None or position == len(entries) - 1:
+                keep.add(position)
+                continue
+            
+            age = now - created
+            for tier, (max_age, granularity) in enumerate(self.backup_retention):
+                if max_age is None or age <= max_age:
+                    break
+            
+            if granularity == "all":
+                keep.add(position)
+                continue
+            
+            bucket = (tier, created.strftime(self.RETENTION_BUCKETS[granularity]))
+            if bucket not in seen_buckets:
+                seen_buckets.add(bucket)
+                keep.add(position)
+        
+        if len(keep) == len(entries):
+            return 0
+        
+        # Walk oldest to newest, folding pruned backups forward. Nothing
+        # on disk changes yet: merged contents and files to delete are
+        # only collected
+        kept_entries = []
+        merged = {}
+        obsolete = []
+        carry = []
+        carry_full = False
+        for position, entry in enumerate(entries):
+            path = os.path.join(self.backup_folder, entry["filename"])
+            if entry["kind"] == "full":
+                # A full snapshot does not depend on anything before it
+                carry = []
+                carry_full = False
+            
+            if position not in keep:
+                with open(path, "rb") as file:
+                    carry.append(file.read())
+                carry_full = carry_full or entry["kind"] == "full"
+                obsolete.append(entry["filename"])
+                continue
+            
+            if carry:
+                with open(path, "rb") as file:
+                    carry.append(file.read())
+                contents = b"".join(carry)
+                if carry_full:
+                    obsolete.append(entry["filename"])
+                    entry["filename"] = entry["filename"].replace(".delta.csv", ".csv")
+                    entry["kind"] = "full"
+                merged[entry["filename"]] = contents
+                entry["size"] = len(contents)
+                carry = []
+                carry_full = False
+            
+            kept_entries.append(entry)
+        
+        # Merged backups are written beside the originals first, then the
+        # index records the new chain together with the remaining file
+        # moves, and only then are files replaced and deleted. A crash at
+        # any point leaves either the old chain intact or a pending step
+        # that _load_backup_index finishes
+        pending = {"replace": {}, "remove": obsolete}
+        for filename, contents in merged.items():
+            temp_name = f"{filename}.merge"
+            self._atomic_write(os.path.join(self.backup_folder, temp_name), contents)
+            pending["replace"][temp_name] = filename
+        
+        index["entries"] = kept_entries
+        trailing_deltas = 0
+        for entry in reversed(kept_entries):
+            if entry["kind"] == "full":
+                break
+            trailing_deltas += 1
+        index["deltas_since_base"] = trailing_deltas
+        index["pending"] = pending
+        self._save_backup_index(index)
+        self._finish_pending_prune(index)
+        return len(entries) - len(kept_entries)
+    
+    def _finish_pending_prune(self, index):
+        """
+        Apply the file moves recorded by _prune_backup_entries
+        
+        Safe to repeat: moves and deletions that already happened are
+        skipped. The index is saved without the pending record afterwards.
+        
+        Args:
+            index (dict): Backup index with a "pending" record
+        """
+        pending = index.pop("pending")
+        for temp_name, filename in pending["replace"].items():
+            temp_path = os.path.join(self.backup_folder, temp_name)
+            if os.path.exists(temp_path):
+                os.replace(temp_path, os.path.join(self.backup_folder, filename))
+        
+        for filename in pending["remove"]:
+            path = os.path.join(self.backup_folder, filename)
+            if os.path.exists(path):
+                os.remove(path)
+        self._save_backup_index(index)
+    
+    def _read_backup_chain(self, backup_file):
+        """
+        Rebuild the contents of a backup from its full snapshot and deltas
+        
+        Args:
+            backup_file (str): Path of a backup file
+        
+        Returns:
+            bytes: Expenses file contents at the time of the backup
+        """
+        filename = os.path.basename(backup_file)
+        entries = self._load_backup_index()["entries"]
+        position = next((i for i, entry in enumerate(entries) if entry["filename"] == filename), None)
+        
+        if position is None or entries[position]["kind"] == "full":
+            with open(backup_file, "rb") as file:
+                return file.read()
+        
+        base = position
+        while base > 0 and entries[base]["kind"] != "full":
+            base -= 1
+        if entries[base]["kind"] != "full":
+            raise ValueError(f"No full snapshot found for {filename}")
+        
+        parts = []
+        for entry in entries[base:position + 1]:
+            with open(os.path.join(self.backup_folder, entry["filename"]), "rb") as file:
+                parts.append(file.read())
+        return b"".join(parts)
+    
+    def restore_backup(self, backup_file):
+        """Restore expenses from a backup file (full snapshot or delta)"""
+        with self._io_lock:
+            try:
+                if os.path.exists(backup_file):
+                    contents = self._read_backup_chain(backup_file)
+                    if self.store is not None:
+                        reader = csv.DictReader(io.StringIO(contents.decode("utf-8"), newline=""))
+                        self.store.save_expenses(list(self._filter_rows(reader, None, None, None)))
+                        return True
+                    # A restore is a rewrite: new generation, so the next
+                    # backup is a full one
+                    self._save_meta({
+                        "size": len(contents),
+                        "crc32": zlib.crc32(contents),
+                        "rows": None,
+                        "wal_seq": self._last_wal_seq(),
+                        "generation": self._new_generation()
+                    })
+                    self._atomic_write(self.expenses_file, contents)
+                    self._remember_verified()
+                    
+                    # Journaled expenses are newer than the restored state
+                    self._remove_journal()
+                    return True
+            except Exception as e:
+                print(f"❌ Error restoring backup: {e}")
+            
+            return False
     
     def list_backups(self):
-        """List all available backup files"""
+        """List all available backup files, newest first"""
         try:
             backups = []
-            for file in os.listdir(self.backup_folder):
-                if file.endswith(".csv"):
-                    filepath = os.path.join(self.backup_folder, file)
-                    backups.append({
-                        "filename": file,
-                        "path": filepath,
-                        "size": os.path.getsize(filepath)
-                    })
+            for entry in self._load_backup_index()["entries"]:
+                backups.append({
+                    "filename": entry["filename"],
+                    "path": os.path.join(self.backup_folder, entry["filename"]),
+                    "size": entry["size"],
+                    "kind": entry["kind"]
+                })
             
-            # Sort by filename (which includes timestamp)
-            backups.sort(key=lambda x: x["filename"], reverse=True)
+            # Index entries are kept in filename (timestamp) order
+            backups.reverse()
             return backups
             
         except Exception as e:
             print(f"❌ Error listing backups: {e}")
-            return []
\ No newline at end of file
+            return []
+
+def _parse_csv_range(task):
+    """
+    Parse and validate one byte range of a CSV file (process pool worker)
+    
+    Args:
+        task (tuple): (path, start, end, fieldnames, start_day, end_day,
+            categories) as prepared by FileManager._iter_rows_parallel
+    
+    Returns:
+        tuple: (list of (amount_paise, category, date, day, description)
+            tuples, list of invalid-row messages), both in file order
+    """
+    path, start, end, fieldnames, start_day, end_day, categories = task
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8"), newline=""), fieldnames=fieldnames)
+    errors = []
+    rows = [
+        (expense.amount_paise, expense.category, expense.date, expense.day, expense.description)
+        for expense in FileManager._filter_rows(reader, start_day, end_day, categories, errors)
+    ]
+    return rows, errors
\ No newline at end of file
@@ -11,19 +11,28 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from expense_manager import ExpenseManager
-from utils import print_header, print_info
+from expense import Expense
+from utils import print_header, print_info, format_currency, get_current_month, get_month_name
 
 def display_main_menu():
     """Display main menu and handle user choice"""
-    expense_manager = ExpenseManager()
-    
+    expense_manager = ExpenseManager(autosave=True)
+    try:
+        run_main_menu(expense_manager)
+    finally:
+        # Guaranteed final flush, however the menu loop ended
+        if not expense_manager.close():
+            print("❌ Some changes could not be saved!")
+
+def run_main_menu(expense_manager):
+    """Main menu loop"""
     while True:
         # Clear screen (for better UX)
         print("\n" * 50)
         
         print_header("PERSONAL FINANCE MANAGER")
-        print(f"\n📅 Current Month: {expense_manager.report_generator.get_monthly_report()['month_name']}")
-        print(f"💰 Total Expenses: ₹{expense_manager.get_total_expenses():,.2f}")
+        print(f"\n📅 Current Month: {get_month_name(get_current_month())}")
+        print(f"💰 Total Expenses: {format_currency(expense_manager.get_total_expenses())}")
         print(f"📊 Expenses Count: {len(expense_manager.expenses)}")
         
         print("\n" + "=" * 40)
@@ -65,7 +74,6 @@ def display_main_menu():
                 help_menu()
             elif choice == "0":
                 print_info("Thank you for using Personal Finance Manager!")
-                expense_manager.save_expenses()
                 break
             else:
                 print("❌ Invalid choice! Please enter 0-9")
@@ -73,7 +81,6 @@ def display_main_menu():
                 
         except KeyboardInterrupt:
             print("\n\n⚠️  Application interrupted. Saving data...")
-            expense_manager.save_expenses()
             break
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -128,11 +135,11 @@ def add_expense_menu(expense_manager):
         description = input("\nEnter description (optional): ").strip()
         
         # Create and add expense
-        expense = Expense(amount, category, date_input, description)
+        expense = Expense(amount_input, category, date_input, description)
         
         if expense_manager.add_expense(expense):
             print(f"\n✅ Expense added successfully!")
-            print(f"   Amount: ₹{amount:,.2f}")
+            print(f"   Amount: {format_currency(expense.amount_paise)}")
             print(f"   Category: {category}")
             print(f"   Date: {date_input}")
             if description:
@@ -171,11 +178,11 @@ def view_expenses_menu(expense_manager):
         else:
             desc = expense.description
         
-        print(f"{date_str:12} {expense.category:15} ₹{expense.amount:13,.2f} {desc:30}")
-        total += expense.amount
+        print(f"{date_str:12} {expense.category:15} {format_currency(expense.amount_paise):>14} {desc:30}")
+        total += expense.amount_paise
     
     print("-" * 80)
-    print(f"{'TOTAL':27} ₹{total:13,.2f}")
+    print(f"{'TOTAL':27} {format_currency(total):>14}")
     
     input("\nPress Enter to continue...")
 
@@ -192,7 +199,7 @@ def category_summary_menu(expense_manager):
     
     report = expense_manager.get_category_summary()
     
-    print(f"\nTotal Expenses: ₹{report['total']:,.2f}")
+    print(f"\nTotal Expenses: {format_currency(report['total'])}")
     print(f"Number of Expenses: {report['count']}")
     print("-" * 60)
     
@@ -203,7 +210,7 @@ def category_summary_menu(expense_manager):
         percentage = item['percentage']
         bar_length = int(percentage / 2)  # Scale for display
         bar = "█" * bar_length
-        print(f"{item['category']:20}: ₹{item['amount']:10,.2f} ({percentage:5.1f}%) {bar}")
+        print(f"{item['category']:20}: {format_currency(item['amount']):>11} ({percentage:5.1f}%) {bar}")
     
     print("-" * 60)
     
@@ -238,9 +245,9 @@ def monthly_report_menu(expense_manager):
     
     print(f"\n📅 Monthly Report: {report['month_name']}")
     print("-" * 60)
-    print(f"Total Expenses: ₹{report['total_expenses']:,.2f}")
+    print(f"Total Expenses: {format_currency(report['total_expenses'])}")
     print(f"Number of Expenses: {report['expense_count']}")
-    print(f"Average per Day: ₹{report['avg_per_day']:,.2f}")
+    print(f"Average per Day: {format_currency(report['avg_per_day'])}")
     print("-" * 60)
     
     if report['category_totals']:
@@ -248,13 +255,13 @@ def monthly_report_menu(expense_manager):
         print("-" * 60)
         for category, amount in report['category_totals'].items():
             percentage = (amount / report['total_expenses'] * 100) if report['total_expenses'] > 0 else 0
-            print(f"{category:20}: ₹{amount:10,.2f} ({percentage:5.1f}%)")
+            print(f"{category:20}: {format_currency(amount):>11} ({percentage:5.1f}%)")
     
     if report['top_expenses']:
         print("\nTop 5 Expenses:")
         print("-" * 60)
         for expense in report['top_expenses']:
-            print(f"  ₹{expense.amount:8,.2f} - {expense.category:15} - {expense.description}")
+            print(f"  {format_currency(expense.amount_paise):>9} - {expense.category:15} - {expense.description}")
     
     input("\nPress Enter to continue...")
 
@@ -309,13 +316,13 @@ def search_expenses_menu(expense_manager):
         for expense in results:
             print(f"\n  Date: {expense.date}")
             print(f"  Category: {expense.category}")
-            print(f"  Amount: ₹{expense.amount:,.2f}")
+            print(f"  Amount: {format_currency(expense.amount_paise)}")
             if expense.description:
                 print(f"  Description: {expense.description}")
             print("-" * 40)
-            total += expense.amount
+            total += expense.amount_paise
         
-        print(f"\n💰 Total of matching expenses: ₹{total:,.2f}")
+        print(f"\n💰 Total of matching expenses: {format_currency(total)}")
     
     input("\nPress Enter to continue...")
 
@@ -332,7 +339,7 @@ def backup_data_menu(expense_manager):
     choice = input("Enter choice (1-2): ").strip()
     
     if choice == "1":
-        backup_file = expense_manager.file_manager.create_backup()
+        backup_file = expense_manager.backup()
         if backup_file:
             import os
             print(f"\n✅ Backup created: {os.path.basename(backup_file)}")
@@ -410,9 +417,10 @@ def utilities_menu(expense_manager):
     print("\n1. Clear All Expenses")
     print("2. Generate Sample Data")
     print("3. View Statistics")
+    print(f"4. Switch Storage Backend (current: {expense_manager.file_manager.backend})")
     print("-" * 40)
     
-    choice = input("Enter choice (1-3): ").strip()
+    choice = input("Enter choice (1-4): ").strip()
     
     if choice == "1":
         confirm = input("\n⚠️  WARNING: This will delete ALL expenses! Type 'DELETE' to confirm: ")
@@ -439,13 +447,31 @@ def utilities_menu(expense_manager):
         else:
             print("\n📊 STATISTICS")
             print("-" * 40)
-            print(f"Total Expenses: ₹{stats['total']:,.2f}")
+            print(f"Total Expenses: {format_currency(stats['total'])}")
             print(f"Number of Expenses: {stats['count']}")
-            print(f"Average Expense: ₹{stats['average']:,.2f}")
-            print(f"Highest Expense: ₹{stats['max']:,.2f}")
-            print(f"Lowest Expense: ₹{stats['min']:,.2f}")
+            print(f"Average Expense: {format_currency(stats['average'])}")
+            print(f"Highest Expense: {format_currency(stats['max'])}")
+            print(f"Lowest Expense: {format_currency(stats['min'])}")
             print(f"Date Range: {stats['start_date']} to {stats['end_date']}")
     
+    elif choice == "4":
+        current = expense_manager.file_manager.backend
+        targets = [backend for backend in expense_manager.file_manager.STORAGE_BACKENDS if backend != current]
+        print()
+        for number, backend in enumerate(targets, 1):
+            print(f"{number}. {backend}")
+        target_input = input(f"Migrate to (1-{len(targets)}): ").strip()
+        target = targets[int(target_input) - 1] if target_input.isdigit() and 1 <= int(target_input) <= len(targets) else None
+        if target is None:
+            print("❌ Invalid choice!")
+        elif input(f"\nMigrate all expenses from {current} to {target}? (y/n): ").strip().lower() == "y":
+            if expense_manager.migrate_storage(target):
+                print(f"✅ Expenses migrated to {target}. The {current} files were kept as a fallback.")
+            else:
+                print(f"❌ Migration failed! Still using {current}.")
+        else:
+            print("❌ Operation cancelled.")
+    
     else:
         print("❌ Invalid choice!")
     
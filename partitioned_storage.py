@@ -0,0 +1,285 @@
+"""
+Partitioned Storage Module
+Stores expenses as one CSV file per month
+"""
+
+import csv
+import io
+import json
+import os
+import zlib
+from expense import Expense
+from utils import month_day_range, paise_to_str, parse_date
+
+class PartitionedStorage:
+    """
+    Month-partitioned storage backend used by FileManager(backend="partitioned")
+    
+    Each month lives in its own CSV file (data/2025/2025-03.csv) and a
+    small manifest (partitions.json) records every partition's size,
+    checksum, row count and per-category totals. Saves only rewrite
+    partitions whose contents changed, adds append to one month's file,
+    and date-filtered reads open only the months they overlap.
+    
+    Expenses are returned month by month, in insertion order within a
+    month.
+    """
+    
+    FIELDNAMES = ["Date", "Category", "Amount", "Description"]
+    
+    def __init__(self, data_folder, atomic_write):
+        """
+        Open the partitioned layout
+        
+        Args:
+            data_folder (str): Folder holding the year folders
+            atomic_write (callable): atomic_write(path, data) used for
+                partition rewrites and the manifest
+        """
+        self.data_folder = data_folder
+        self.manifest_file = os.path.join(data_folder, "partitions.json")
+        self._atomic_write = atomic_write
+        self.manifest = self._load_manifest()
+    
+    def close(self):
+        """Nothing to release; present for the storage interface"""
+    
+    def _load_manifest(self):
+        """Load the manifest, or an empty one"""
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {"version": 1, "partitions": {}}
+    
+    def _save_manifest(self):
+        """Write the manifest atomically"""
+        self._atomic_write(self.manifest_file, json.dumps(self.manifest, indent=2).encode("utf-8"))
+    
+    def _partition_path(self, month):
+        """File of a month partition (YYYY/YYYY-MM.csv)"""
+        return os.path.join(self.data_folder, month[:4], f"{month}.csv")
+    
+    def _encode(self, rows, header):
+        """CSV bytes for row lists, optionally with the header row"""
+        buffer = io.StringIO(newline="")
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(self.FIELDNAMES)
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+    
+    def _row(self, expense):
+        """CSV row for an expense"""
+        return [expense.date, expense.category, paise_to_str(expense.amount_paise), expense.description]
+    
+    def _partition_entry(self, data, expenses):
+        """Manifest entry for a partition's bytes and expenses"""
+        entry = {
+            "size": len(data),
+            "crc32": zlib.crc32(data),
+            "rows": 0,
+            "total": 0,
+            "categories": {},
+            "category_rows": {}
+        }
+        self._count(entry, expenses)
+        return entry
+    
+    def _count(self, entry, expenses):
+        """Add expenses to a manifest entry's row counts and totals"""
+        for expense in expenses:
+            entry["rows"] += 1
+            entry["total"] += expense.amount_paise
+            entry["categories"][expense.category] = entry["categories"].get(expense.category, 0) + expense.amount_paise
+            entry["category_rows"][expense.category] = entry["category_rows"].get(expense.category, 0) + 1
+    
+    def months(self):
+        """Months (YYYY-MM) with a partition, oldest first"""
+        return sorted(self.manifest["partitions"])
+    
+    def count(self):
+        """Number of stored expenses"""
+        return sum(entry["rows"] for entry in self.manifest["partitions"].values())
+    
+    def save_expenses(self, expenses):
+        """
+        Store all expenses, rewriting only the partitions that changed
+        
+        Every month is serialized in memory, but only months whose
+        checksum differs from the manifest are written to disk; months
+        that no longer have expenses are removed.
+        
+        Args:
+            expenses (iterable): Expense objects
+        """
+        by_month = {}
+        for expense in expenses:
+            by_month.setdefault(expense.date[:7], []).append(expense)
+        
+        partitions = self.manifest["partitions"]
+        for month, month_expenses in sorted(by_month.items()):
+            data = self._encode(map(self._row, month_expenses), header=True)
+            entry = partitions.get(month)
+            path = self._partition_path(month)
+            if entry is None or entry["crc32"] != zlib.crc32(data) or entry["size"] != len(data) or not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._atomic_write(path, data)
+                partitions[month] = self._partition_entry(data, month_expenses)
+        
+        for month in set(partitions) - set(by_month):
+            self._remove_partition(month)
+        self._save_manifest()
+    
+    def append_expenses(self, expenses, clear=False):
+        """
+        Append expenses to their month partitions
+        
+        Args:
+            expenses (list): Expense objects to append
+            clear (bool): Remove all partitions first
+        """
+        if clear:
+            for month in list(self.manifest["partitions"]):
+                self._remove_partition(month)
+        
+        by_month = {}
+        for expense in expenses:
+            by_month.setdefault(expense.date[:7], []).append(expense)
+        
+        partitions = self.manifest["partitions"]
+        for month, month_expenses in by_month.items():
+            path = self._partition_path(month)
+            entry = partitions.get(month)
+            if entry is None or not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                data = self._encode(map(self._row, month_expenses), header=True)
+                self._atomic_write(path, data)
+                partitions[month] = self._partition_entry(data, month_expenses)
+                continue
+            
+            data = self._encode(map(self._row, month_expenses), header=False)
+            with open(path, "ab") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            entry["size"] += len(data)
+            entry["crc32"] = zlib.crc32(data, entry["crc32"])
+            self._count(entry, month_expenses)
+        self._save_manifest()
+    
+    def _remove_partition(self, month):
+        """Delete a month's file (and its year folder once empty)"""
+        self.manifest["partitions"].pop(month, None)
+        path = self._partition_path(month)
+        if os.path.exists(path):
+            os.remove(path)
+        folder = os.path.dirname(path)
+        if os.path.isdir(folder) and not os.listdir(folder):
+            os.rmdir(folder)
+    
+    def _months_between(self, start_date, end_date):
+        """Stored months overlapping [start_date, end_date] (YYYY-MM-DD or None)"""
+        return [
+            month for month in self.months()
+            if (start_date is None or month >= start_date[:7]) and (end_date is None or month <= end_date[:7])
+        ]
+    
+    def iter_expenses(self, start_date=None, end_date=None, categories=None):
+        """
+        Stream matching expenses, reading only the months in range
+        
+        Args:
+            start_date (str): Earliest date to include (YYYY-MM-DD)
+            end_date (str): Latest date to include (YYYY-MM-DD)
+            categories (iterable): Categories to include (default: all)
+        
+        Yields:
+            Expense: Matching expenses
+        """
+        if categories is not None:
+            categories = set(categories)
+        for month in self._months_between(start_date, end_date):
+            for expense in self.iter_month(month):
+                if categories is not None and expense.category not in categories:
+                    continue
+                if start_date is not None and expense.date < start_date:
+                    continue
+                if end_date is not None and expense.date > end_date:
+                    continue
+                yield expense
+    
+    def iter_month(self, month):
+        """
+        Stream the expenses of one month from its partition
+        
+        Args:
+            month (str): Month in YYYY-MM format
+        
+        Yields:
+            Expense: Valid expenses of the month (invalid rows are reported)
+        """
+        path = self._partition_path(month)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                try:
+                    yield Expense(
+                        amount=row["Amount"],
+                        category=row["Category"],
+                        date=row["Date"],
+                        description=row["Description"]
+                    )
+                except (ValueError, TypeError, AttributeError) as e:
+                    print(f"⚠️  Skipping invalid row: {e}")
+    
+    def _is_current(self, month):
+        """Check that a partition file still matches its manifest entry"""
+        path = self._partition_path(month)
+        return os.path.exists(path) and os.path.getsize(path) == self.manifest["partitions"][month]["size"]
+    
+    def summarize(self, start_date=None, end_date=None, categories=None):
+        """
+        Total, count and per-category totals
+        
+        Months fully inside the range come from the manifest without
+        reading their files; only partial months are read.
+        
+        Returns:
+            dict: Total (paise), count and per-category totals (paise)
+        """
+        start_day = parse_date(start_date)[1] if start_date else None
+        end_day = parse_date(end_date)[1] if end_date else None
+        if categories is not None:
+            categories = set(categories)
+        
+        total = 0
+        count = 0
+        category_totals = {}
+        for month in self._months_between(start_date, end_date):
+            first_day, last_day = month_day_range(month)
+            whole_month = (start_day is None or start_day <= first_day) and (end_day is None or end_day >= last_day)
+            if whole_month and self._is_current(month):
+                entry = self.manifest["partitions"][month]
+                for category, amount in entry["categories"].items():
+                    if categories is None or category in categories:
+                        total += amount
+                        count += entry["category_rows"][category]
+                        category_totals[category] = category_totals.get(category, 0) + amount
+                continue
+            
+            for expense in self.iter_month(month):
+                if categories is not None and expense.category not in categories:
+                    continue
+                if (start_day is not None and expense.day < start_day) or (end_day is not None and expense.day > end_day):
+                    continue
+                total += expense.amount_paise
+                count += 1
+                category_totals[expense.category] = category_totals.get(expense.category, 0) + expense.amount_paise
+        
+        return {
+            "total": total,
+            "count": count,
+            "category_totals": category_totals
+        }
\ No newline at end of file
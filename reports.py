@@ -0,0 +1,221 @@
+"""
+Reports Module
+Generates category and monthly reports from expense data
+"""
+
+import heapq
+import os
+from datetime import datetime
+from utils import format_currency, get_current_month, get_month_name, month_day_range
+
+class ReportGenerator:
+    """
+    Builds expense reports from incrementally maintained aggregates
+    
+    Category and monthly totals are updated by add() and remove() as
+    expenses change, so summaries are read from precomputed values
+    instead of being recomputed over every expense.
+    """
+    
+    def __init__(self, expenses, export_folder=os.path.join("data", "reports")):
+        """
+        Initialize report generator
+        
+        Args:
+            expenses: Expense collection (list or ExpenseTable) to report on
+            export_folder (str): Folder that exported reports are written to
+        """
+        self.export_folder = export_folder
+        self.reset(expenses)
+    
+    def reset(self, expenses):
+        """
+        Rebuild all aggregates from an expense collection
+        
+        Args:
+            expenses: Expense collection to report on
+        """
+        self.expenses = expenses
+        self.total = 0
+        self.count = 0
+        self.category_totals = {}
+        self.monthly = {}
+        for expense in expenses:
+            self.add(expense)
+    
+    def add(self, expense):
+        """Account for a newly added expense"""
+        self._apply(expense, 1)
+    
+    def remove(self, expense):
+        """Account for a removed expense"""
+        self._apply(expense, -1)
+    
+    def _apply(self, expense, sign):
+        """Add (sign=1) or subtract (sign=-1) an expense from every aggregate"""
+        amount = expense.amount_paise * sign
+        category = expense.category
+        self.total += amount
+        self.count += sign
+        self.category_totals[category] = self.category_totals.get(category, 0) + amount
+        
+        month = self.monthly.get(expense.date[:7])
+        if month is None:
+            month = self.monthly[expense.date[:7]] = {"total": 0, "count": 0, "categories": {}}
+        month["total"] += amount
+        month["count"] += sign
+        month["categories"][category] = month["categories"].get(category, 0) + amount
+    
+    def get_category_summary(self):
+        """
+        Get category-wise expense summary
+        
+        Returns:
+            dict: Total, count and per-category amounts (paise) and percentages
+        """
+        summary = []
+        for category, amount in self.category_totals.items():
+            if amount:
+                summary.append({
+                    "category": category,
+                    "amount": amount,
+                    "percentage": amount / self.total * 100 if self.total else 0
+                })
+        summary.sort(key=lambda item: item["amount"], reverse=True)
+        
+        return {
+            "total": self.total,
+            "count": self.count,
+            "summary": summary
+        }
+    
+    def get_monthly_report(self, month=None):
+        """
+        Get expense report for a month
+        
+        Args:
+            month (str): Month in YYYY-MM format (default: current month)
+        
+        Returns:
+            dict: Month totals (paise), category breakdown and top expenses
+        """
+        if not month:
+            month = get_current_month()
+        
+        stats = self.monthly.get(month, {"total": 0, "count": 0, "categories": {}})
+        category_totals = {
+            category: amount
+            for category, amount in sorted(stats["categories"].items(), key=lambda item: item[1], reverse=True)
+            if amount
+        }
+        
+        return {
+            "month": month,
+            "month_name": get_month_name(month),
+            "total_expenses": stats["total"],
+            "expense_count": stats["count"],
+            "avg_per_day": stats["total"] / self._days_in_report(month),
+            "category_totals": category_totals,
+            "top_expenses": self._top_expenses(month) if stats["count"] else []
+        }
+    
+    def _days_in_report(self, month):
+        """Days the monthly average is spread over (days so far for the current month)"""
+        try:
+            first_day, last_day = month_day_range(month)
+        except ValueError:
+            return 1
+        if month == get_current_month():
+            last_day = datetime.now().date().toordinal()
+        return last_day - first_day + 1
+    
+    def _top_expenses(self, month, limit=5):
+        """Largest expenses of a month"""
+        if hasattr(self.expenses, "month_rows"):
+            # ExpenseTable: only visit the month's rows
+            rows = (self.expenses[index] for index in self.expenses.month_rows(month))
+        else:
+            rows = (expense for expense in self.expenses if expense.date.startswith(month))
+        return heapq.nlargest(limit, rows, key=lambda expense: expense.amount_paise)
+    
+    def search_expenses(self, search_term, search_by="all"):
+        """
+        Search expenses
+        
+        Args:
+            search_term (str): Text to search for
+            search_by (str): "category", "date", "description" or "all"
+        
+        Returns:
+            list: Matching expenses
+        """
+        term = search_term.strip().lower()
+        if not term:
+            return []
+        
+        results = []
+        for expense in self.expenses:
+            if search_by == "category":
+                matched = expense.category.lower() == term
+            elif search_by == "date":
+                matched = expense.date == term
+            elif search_by == "description":
+                matched = term in expense.description.lower()
+            else:
+                matched = (expense.category.lower() == term
+                           or expense.date == term
+                           or term in expense.description.lower())
+            if matched:
+                results.append(expense)
+        return results
+    
+    def export_report(self, report_data, report_type):
+        """
+        Export a report to a text file
+        
+        Args:
+            report_data (dict): Report from get_category_summary or get_monthly_report
+            report_type (str): "category" or "monthly"
+        
+        Returns:
+            str: Path of the exported file, or None on failure
+        """
+        try:
+            os.makedirs(self.export_folder, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = os.path.join(self.export_folder, f"{report_type}_report_{timestamp}.txt")
+            
+            lines = []
+            if report_type == "category":
+                lines.append("CATEGORY SUMMARY REPORT")
+                lines.append("=" * 50)
+                lines.append(f"Total Expenses: {format_currency(report_data['total'])}")
+                lines.append(f"Number of Expenses: {report_data['count']}")
+                lines.append("-" * 50)
+                for item in report_data["summary"]:
+                    lines.append(f"{item['category']:20}: {format_currency(item['amount']):>14} ({item['percentage']:5.1f}%)")
+            else:
+                lines.append(f"MONTHLY REPORT - {report_data['month_name']}")
+                lines.append("=" * 50)
+                lines.append(f"Total Expenses: {format_currency(report_data['total_expenses'])}")
+                lines.append(f"Number of Expenses: {report_data['expense_count']}")
+                lines.append(f"Average per Day: {format_currency(report_data['avg_per_day'])}")
+                lines.append("-" * 50)
+                for category, amount in report_data["category_totals"].items():
+                    lines.append(f"{category:20}: {format_currency(amount):>14}")
+                if report_data["top_expenses"]:
+                    lines.append("-" * 50)
+                    lines.append("Top Expenses:")
+                    for expense in report_data["top_expenses"]:
+                        lines.append(f"  {expense}")
+            
+            lines.append("")
+            lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            
+            with open(filename, "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+            return filename
+        
+        except Exception as e:
+            print(f"❌ Error exporting report: {e}")
+            return None
\ No newline at end of file
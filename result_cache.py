@@ -0,0 +1,76 @@
+"""
+Result Cache Module
+Bounded LRU cache for query results keyed by data version
+"""
+
+from collections import OrderedDict
+
+class ResultCache:
+    """
+    LRU cache for report and statistics results
+    
+    Entries are keyed by (query, parameters, data version). Callers bump
+    their data version whenever the underlying expenses change, so stale
+    results are never returned; they simply stop being requested and
+    age out of the cache.
+    """
+    
+    def __init__(self, max_entries=64):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries (int): Maximum number of cached results
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+    
+    def get_or_compute(self, query, params, version, compute):
+        """
+        Return a cached result, computing and storing it on a miss
+        
+        Args:
+            query (str): Query name
+            params (tuple): Hashable query parameters
+            version (int): Data version the result is valid for
+            compute (callable): Zero-argument function producing the result
+        
+        Returns:
+            The cached or freshly computed result
+        """
+        key = (query, params, version)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        
+        self.misses += 1
+        result = compute()
+        self._entries[key] = result
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return result
+    
+    def clear(self):
+        """Drop every cached result"""
+        self._entries.clear()
+    
+    def stats(self):
+        """
+        Get cache counters
+        
+        Returns:
+            dict: hits, misses, evictions, current size and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
\ No newline at end of file
@@ -0,0 +1,375 @@
+"""
+Snapshot Module
+Binary columnar snapshot of the expenses file for fast startup
+"""
+
+import mmap
+import operator
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from datetime import datetime
+from itertools import compress
+from expense import Expense
+
+class ExpenseSnapshot:
+    """
+    Expenses as fixed-width columns plus a description pool
+    
+    File layout (little-endian):
+        header        HEADER (48 bytes)
+        amounts       int64 paise, one per row
+        days          int32 day ordinals
+        description   uint32 pool index per row
+        pool offsets  uint32, pool size + 1 entries into the blob
+        categories    uint8 index into Expense.CATEGORIES
+        blob          UTF-8 descriptions, back to back
+    
+    Columns are ordered widest first so every column starts on a
+    multiple of its item size. The header records the size and mtime
+    of the expenses file the snapshot was taken from; a snapshot whose
+    source no longer matches is stale and must not be used. The CRC32
+    covers everything after the header.
+    """
+    
+    MAGIC = b"PFMSNAP1"
+    VERSION = 1
+    
+    # magic, version, reserved, rows, pool size, source size,
+    # source mtime (ns), write-ahead log sequence number, body CRC32
+    HEADER = struct.Struct("<8sHHIIQqQI")
+    
+    def __init__(self, amounts, days, categories, description_ids, pool, wal_seq=0):
+        """
+        Initialize a snapshot from columns
+        
+        Args:
+            amounts (array): Amounts in paise ("q")
+            days (array): Day ordinals ("i")
+            categories (array): Category codes ("B")
+            description_ids (array): Index into pool per row ("I")
+            pool (list): Distinct descriptions
+            wal_seq (int): Last write-ahead log record included
+        """
+        self.amounts = amounts
+        self.days = days
+        self.categories = categories
+        self.description_ids = description_ids
+        self.pool = pool
+        self.wal_seq = wal_seq
+    
+    @classmethod
+    def from_expenses(cls, expenses, wal_seq=0):
+        """
+        Build a snapshot from an expense collection
+        
+        An ExpenseTable hands over its columns directly; any other
+        collection is converted row by row.
+        """
+        if hasattr(expenses, "description_ids"):
+            return cls(
+                array("q", expenses.amounts),
+                array("i", expenses.days),
+                array("B", expenses.categories),
+                array("I", expenses.description_ids),
+                list(expenses._pool),
+                wal_seq
+            )
+        
+        snapshot = cls(array("q"), array("i"), array("B"), array("I"), [], wal_seq)
+        pool_ids = {}
+        for expense in expenses:
+            snapshot.amounts.append(expense.amount_paise)
+            snapshot.days.append(expense.day)
+            snapshot.categories.append(Expense.CATEGORIES.index(expense.category))
+            description_id = pool_ids.get(expense.description)
+            if description_id is None:
+                description_id = pool_ids[expense.description] = len(snapshot.pool)
+                snapshot.pool.append(expense.description)
+            snapshot.description_ids.append(description_id)
+        return snapshot
+    
+    def __len__(self):
+        return len(self.amounts)
+    
+    def to_bytes(self, source_size, source_mtime_ns):
+        """
+        Encode the snapshot
+        
+        Args:
+            source_size (int): Size of the expenses file it mirrors
+            source_mtime_ns (int): Modification time of that file
+        
+        Returns:
+            bytes: Snapshot file contents
+        """
+        encoded = [description.encode("utf-8") for description in self.pool]
+        offsets = array("I", [0])
+        for description in encoded:
+            offsets.append(offsets[-1] + len(description))
+        
+        columns = [array("q", self.amounts), array("i", self.days), array("I", self.description_ids), offsets]
+        if sys.byteorder != "little":
+            for column in columns:
+                column.byteswap()
+        
+        body = b"".join([column.tobytes() for column in columns] + [self.categories.tobytes()] + encoded)
+        header = self.HEADER.pack(
+            self.MAGIC, self.VERSION, 0, len(self.amounts), len(self.pool),
+            source_size, source_mtime_ns, self.wal_seq, zlib.crc32(body)
+        )
+        return header + body
+    
+    @classmethod
+    def read_header(cls, data):
+        """
+        Decode and check the header of snapshot data
+        
+        Args:
+            data: Snapshot bytes (or any buffer, e.g. an mmap)
+        
+        Returns:
+            dict: rows, pool_size, source_size, source_mtime_ns, wal_seq
+                and crc32
+        
+        Raises:
+            ValueError: If the data is not a snapshot of this version
+        """
+        if len(data) < cls.HEADER.size:
+            raise ValueError("snapshot is truncated")
+        magic, version, _, rows, pool_size, source_size, source_mtime_ns, wal_seq, crc = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("not a version 1 expense snapshot")
+        return {
+            "rows": rows,
+            "pool_size": pool_size,
+            "source_size": source_size,
+            "source_mtime_ns": source_mtime_ns,
+            "wal_seq": wal_seq,
+            "crc32": crc
+        }
+    
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Decode a snapshot, verifying its checksum
+        
+        Args:
+            data (bytes): Snapshot file contents
+        
+        Returns:
+            tuple: (ExpenseSnapshot, header dict from read_header)
+        
+        Raises:
+            ValueError: If the data is truncated or corrupt
+        """
+        header = cls.read_header(data)
+        body = memoryview(data)[cls.HEADER.size:]
+        if zlib.crc32(body) != header["crc32"]:
+            raise ValueError("snapshot checksum mismatch")
+        
+        rows = header["rows"]
+        position = 0
+        columns = []
+        for typecode, count in (("q", rows), ("i", rows), ("I", rows), ("I", header["pool_size"] + 1), ("B", rows)):
+            column = array(typecode)
+            end = position + column.itemsize * count
+            if end > len(body):
+                raise ValueError("snapshot is truncated")
+            column.frombytes(body[position:end])
+            if sys.byteorder != "little":
+                column.byteswap()
+            columns.append(column)
+            position = end
+        amounts, days, description_ids, offsets, categories = columns
+        
+        blob = bytes(body[position:])
+        if len(blob) != offsets[-1]:
+            raise ValueError("snapshot is truncated")
+        pool = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(header["pool_size"])]
+        
+        return cls(amounts, days, categories, description_ids, pool, header["wal_seq"]), header
+    
+    def load_into(self, expenses):
+        """
+        Append the snapshot's expenses to a collection
+        
+        An empty ExpenseTable takes the columns in bulk; other
+        collections receive Expense objects. Rows are trusted: they were
+        validated before the snapshot was written.
+        """
+        if hasattr(expenses, "load_columns") and not len(expenses):
+            expenses.load_columns(self.amounts, self.days, self.categories, self.description_ids, self.pool)
+            return
+        
+        created_ts = datetime.now().timestamp()
+        date_strings = {}
+        for amount_paise, day, code, description_id in zip(self.amounts, self.days, self.categories, self.description_ids):
+            date_str = date_strings.get(day)
+            if date_str is None:
+                date_str = date_strings[day] = datetime.fromordinal(day).date().isoformat()
+            expenses.append(Expense.from_trusted(
+                amount_paise, Expense.CATEGORIES[code], date_str, day, self.pool[description_id], created_ts
+            ))
+
+class MappedSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file
+    
+    Columns are memoryview casts over the mapped pages, so nothing is
+    copied or parsed up front and aggregations read the page cache
+    directly; several processes mapping the same file share one copy.
+    Only available on little-endian machines (the file's byte order).
+    
+    Use as a context manager, or call close() when done.
+    """
+    
+    def __init__(self, path, verify=True):
+        """
+        Map a snapshot file
+        
+        Args:
+            path (str): Snapshot file
+            verify (bool): Check the body CRC32 (reads every page once)
+        
+        Raises:
+            ValueError: If the file is not a valid snapshot
+        """
+        if sys.byteorder != "little":
+            raise ValueError("mapped snapshots need a little-endian machine")
+        
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Every view over the map, released by close(); the map cannot be
+        # closed while any of them is still alive
+        self._views = []
+        try:
+            self.header = ExpenseSnapshot.read_header(self._map)
+            self._view = memoryview(self._map)
+            body = self._view[ExpenseSnapshot.HEADER.size:]
+            self._views.append(body)
+            if verify and zlib.crc32(body) != self.header["crc32"]:
+                raise ValueError("snapshot checksum mismatch")
+            
+            rows = self.header["rows"]
+            pool_size = self.header["pool_size"]
+            sizes = (("q", rows), ("i", rows), ("I", rows), ("I", pool_size + 1), ("B", rows))
+            position = 0
+            columns = []
+            for typecode, count in sizes:
+                end = position + struct.calcsize(typecode) * count
+                if end > len(body):
+                    raise ValueError("snapshot is truncated")
+                columns.append(body[position:end].cast(typecode))
+                self._views.append(columns[-1])
+                position = end
+            self.amounts, self.days, self.description_ids, self._offsets, self.categories = columns
+            self._blob = body[position:]
+            self._views.append(self._blob)
+        except BaseException:
+            self.close()
+            raise
+    
+    @property
+    def wal_seq(self):
+        """Last write-ahead log record included in the snapshot"""
+        return self.header["wal_seq"]
+    
+    def close(self):
+        """Release the column views and unmap the file"""
+        for view in reversed(self._views):
+            view.release()
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+        self._map.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        return self.header["rows"]
+    
+    def description(self, index):
+        """Description of the row at index"""
+        description_id = self.description_ids[index]
+        return bytes(self._blob[self._offsets[description_id]:self._offsets[description_id + 1]]).decode("utf-8")
+    
+    def total_paise(self):
+        """Sum of all amounts in paise"""
+        return sum(self.amounts)
+    
+    def _selectors(self, start_day, end_day):
+        """Row selectors for a day range, or None for all rows"""
+        selectors = None
+        if start_day is not None:
+            selectors = list(map(start_day.__le__, self.days))
+        if end_day is not None:
+            in_range = map(end_day.__ge__, self.days)
+            selectors = list(in_range) if selectors is None else list(map(operator.and_, selectors, in_range))
+        return selectors
+    
+    def summarize(self, start_day=None, end_day=None, categories=None):
+        """
+        Total, count and per-category totals over the mapped columns
+        
+        Args:
+            start_day (int): Earliest day ordinal to include, or None
+            end_day (int): Latest day ordinal to include, or None
+            categories (iterable): Category names to include (default: all)
+        
+        Returns:
+            dict: Total (paise), count and per-category totals (paise)
+        """
+        selectors = self._selectors(start_day, end_day)
+        if categories is None:
+            codes = range(len(Expense.CATEGORIES))
+        else:
+            codes = [Expense.CATEGORIES.index(category) for category in set(categories) if category in Expense.CATEGORIES]
+        
+        total = 0
+        count = 0
+        category_totals = {}
+        for code in codes:
+            matches = map(code.__eq__, self.categories)
+            if selectors is not None:
+                matches = map(operator.and_, selectors, matches)
+            matches = list(matches)
+            rows = sum(matches)
+            if rows:
+                amount = sum(compress(self.amounts, matches))
+                category_totals[Expense.CATEGORIES[code]] = amount
+                total += amount
+                count += rows
+        
+        return {
+            "total": total,
+            "count": count,
+            "category_totals": category_totals
+        }
+    
+    def monthly_totals(self):
+        """
+        Total paise and count per month
+        
+        Returns:
+            dict: YYYY-MM -> {"total": paise, "count": int}
+        """
+        day_totals = {}
+        for day, amount in zip(self.days, self.amounts):
+            day_totals[day] = day_totals.get(day, 0) + amount
+        day_counts = Counter(self.days)
+        
+        monthly = {}
+        for day in sorted(day_totals):
+            month = datetime.fromordinal(day).strftime("%Y-%m")
+            stats = monthly.get(month)
+            if stats is None:
+                stats = monthly[month] = {"total": 0, "count": 0}
+            stats["total"] += day_totals[day]
+            stats["count"] += day_counts[day]
+        return monthly
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+SQLite Storage Module
+Stores expenses in an indexed SQLite database
+"""
+
+import sqlite3
+import threading
+import time
+from array import array
+from expense import Expense
+from utils import parse_date
+
+class SQLiteStorage:
+    """
+    SQLite storage backend used by FileManager(backend="sqlite")
+    
+    Every add is its own small transaction, so nothing is rewritten on
+    save and nothing needs to be read in full on startup except what is
+    asked for. The database runs in WAL mode so readers never block the
+    writer, and date, category and (category, month) indexes let
+    filtered reads and aggregations run as SQL instead of in Python.
+    
+    Rows are loaded in id order, so the database ids are kept in an
+    array parallel to the in-memory table: an edit or delete of table
+    row i is a single UPDATE or DELETE of ids[i]. A rewrite generation
+    stored in the settings table changes whenever rows are replaced,
+    edited or removed (not on adds), which lets backups copy only the
+    rows added since the previous one.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount_paise INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date);
+        CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses (category);
+        CREATE INDEX IF NOT EXISTS idx_expenses_category_month ON expenses (category, month);
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value
+        );
+    """
+    
+    INSERT = """
+        INSERT INTO expenses (date, month, category, amount_paise, description, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    
+    def __init__(self, path):
+        """
+        Open (or create) the database
+        
+        Args:
+            path (str): Database file
+        """
+        self.path = path
+        # The autosave thread may write through the same connection
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+        if self.generation() is None:
+            with self.connection:
+                self._new_generation()
+        self._ids = self._select_ids(0)
+    
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+    
+    def count(self):
+        """Number of stored expenses"""
+        return self.connection.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+    
+    def _select_ids(self, after_id):
+        """Ids greater than after_id, in order"""
+        cursor = self.connection.execute("SELECT id FROM expenses WHERE id > ? ORDER BY id", (after_id,))
+        return array("q", (row_id for row_id, in cursor))
+    
+    def last_id(self):
+        """Id of the newest row (0 when empty)"""
+        return self._ids[-1] if self._ids else 0
+    
+    def generation(self):
+        """Rewrite generation (set when the database is created)"""
+        row = self.connection.execute("SELECT value FROM settings WHERE key = 'generation'").fetchone()
+        return row[0] if row else None
+    
+    def _new_generation(self):
+        """Record a rewrite; the caller holds an open transaction"""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES ('generation', ?)", (time.time_ns(),)
+        )
+    
+    def _row(self, expense):
+        """Column values for an expense"""
+        return (
+            expense.date,
+            expense.date[:7],
+            expense.category,
+            expense.amount_paise,
+            expense.description,
+            expense.created_at.timestamp()
+        )
+    
+    def save_expenses(self, expenses):
+        """
+        Replace all stored expenses in one transaction
+        
+        Args:
+            expenses (iterable): Expense objects
+        """
+        with self._lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM expenses")
+                self.connection.executemany(self.INSERT, map(self._row, expenses))
+                self._new_generation()
+            self._ids = self._select_ids(0)
+    
+    def append_expenses(self, expenses, clear=False):
+        """
+        Insert expenses in one transaction (a single row for one add)
+        
+        Args:
+            expenses (list): Expense objects to insert
+            clear (bool): Delete all earlier expenses first
+        """
+        with self._lock:
+            last_id = 0 if clear else self.last_id()
+            with self.connection:
+                if clear:
+                    self.connection.execute("DELETE FROM expenses")
+                    self._new_generation()
+                self.connection.executemany(self.INSERT, map(self._row, expenses))
+            if clear:
+                self._ids = array("q")
+            self._ids.extend(self._select_ids(last_id))
+    
+    def delete_row(self, index):
+        """
+        Delete the expense at a table position
+        
+        Args:
+            index (int): Position in load (id) order
+        """
+        with self._lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM expenses WHERE id = ?", (self._ids[index],))
+                self._new_generation()
+            del self._ids[index]
+    
+    def update_row(self, index, expense):
+        """
+        Replace the values of the expense at a table position
+        
+        Args:
+            index (int): Position in load (id) order
+            expense (Expense): New values (the creation time is kept)
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE expenses SET date = ?, month = ?, category = ?, amount_paise = ?, description = ? WHERE id = ?",
+                (expense.date, expense.date[:7], expense.category, expense.amount_paise, expense.description, self._ids[index])
+            )
+            self._new_generation()
+    
+    def _where(self, start_date, end_date, categories):
+        """Build a WHERE clause and its parameters for the given filters"""
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("date <= ?")
+            params.append(end_date)
+        if categories is not None:
+            categories = list(categories)
+            conditions.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return clause, params
+    
+    def iter_expenses(self, start_date=None, end_date=None, categories=None, after_id=None):
+        """
+        Stream matching expenses in insertion order
+        
+        Rows were validated when they were inserted, so they are built
+        with Expense.from_trusted.
+        
+        Args:
+            start_date (str): Earliest date to include (YYYY-MM-DD)
+            end_date (str): Latest date to include (YYYY-MM-DD)
+            categories (iterable): Categories to include (default: all)
+            after_id (int): Only rows with a greater id (e.g. last_id()
+                at the previous backup)
+        
+        Yields:
+            Expense: Matching expenses
+        """
+        clause, params = self._where(start_date, end_date, categories)
+        if after_id is not None:
+            clause = f"{clause} AND id > ?" if clause else " WHERE id > ?"
+            params.append(after_id)
+        cursor = self.connection.execute(
+            "SELECT amount_paise, category, date, description, created_at"
+            f" FROM expenses{clause} ORDER BY id", params
+        )
+        for amount_paise, category, date, description, created_at in cursor:
+            yield Expense.from_trusted(amount_paise, category, date, parse_date(date)[1], description, created_at)
+    
+    def summarize(self, start_date=None, end_date=None, categories=None):
+        """
+        Total, count and per-category totals computed by SQL
+        
+        Returns:
+            dict: Total (paise), count and per-category totals (paise)
+        """
+        clause, params = self._where(start_date, end_date, categories)
+        cursor = self.connection.execute(
+            f"SELECT category, SUM(amount_paise), COUNT(*) FROM expenses{clause} GROUP BY category", params
+        )
+        
+        total = 0
+        count = 0
+        category_totals = {}
+        for category, amount, rows in cursor:
+            total += amount
+            count += rows
+            category_totals[category] = amount
+        
+        return {
+            "total": total,
+            "count": count,
+            "category_totals": category_totals
+        }
\ No newline at end of file
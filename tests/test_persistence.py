@@ -0,0 +1,312 @@
+"""
+Persistence Tests
+Crash recovery of the write-ahead log and the binary snapshot
+
+Usage: python -m unittest discover tests   (or: python -m pytest tests)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expense import Expense
+from file_manager import FileManager
+from snapshot import ExpenseSnapshot
+
+def make_expense(amount, day, description):
+    """Food expense on a day of January 2024"""
+    return Expense(amount, "Food", f"2024-01-{day:02d}", description)
+
+def rows(expenses):
+    """Comparable (date, category, paise, description) tuples"""
+    return [(e.date, e.category, e.amount_paise, e.description) for e in expenses]
+
+class PersistenceTestCase(unittest.TestCase):
+    """Each test gets its own data folder"""
+    
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self.data_folder = os.path.join(self._temp.name, "data")
+        self.first = make_expense("10.50", 1, "first")
+        self.second = make_expense("20", 2, "second")
+        self.third = make_expense("3.05", 3, "third")
+    
+    def tearDown(self):
+        self._temp.cleanup()
+    
+    def file_manager(self):
+        """A FileManager as the app opens it after a (re)start"""
+        return FileManager(self.data_folder, use_journal=True, backup_on_save=False, parse_workers=1)
+
+class WriteAheadLogTests(PersistenceTestCase):
+    """Replay of logged adds and clears on the next load"""
+    
+    def test_replay_after_crash(self):
+        fm = self.file_manager()
+        fm.save_expenses([self.first])
+        fm.append_expense(self.second)
+        fm.append_expense(self.third)
+        
+        # The process dies here: the adds exist only in the log
+        self.assertEqual(rows(self.file_manager().load_expenses()), rows([self.first, self.second, self.third]))
+    
+    def test_crash_between_meta_and_data_write(self):
+        fm = self.file_manager()
+        fm.save_expenses([self.first])
+        fm.append_expense(self.second)
+        
+        # The checksum record is written, the expenses file never replaced
+        fm._save_meta({"size": 1, "crc32": 0, "rows": 2, "wal_seq": fm._last_wal_seq()})
+        
+        self.assertEqual(rows(self.file_manager().load_expenses()), rows([self.first, self.second]))
+    
+    def test_compaction_after_crashed_same_size_save(self):
+        fm = self.file_manager()
+        extra = make_expense("20", 2, "extra!")  # same CSV size as second
+        fm.save_expenses([self.first, extra])
+        fm.append_expense(self.second)
+        
+        # Deleting extra saves [first, second], which crashes after the
+        # checksum record is written but before the file is replaced
+        def crash(path, data):
+            if path == fm.expenses_file:
+                raise OSError("simulated crash")
+            FileManager._atomic_write(fm, path, data)
+        fm._atomic_write = crash
+        self.assertFalse(fm.save_expenses([self.first, self.second]))
+        
+        restarted = self.file_manager()
+        self.assertEqual(rows(restarted.load_expenses()), rows([self.first, extra, self.second]))
+        restarted.append_expense(self.third)
+        self.assertTrue(restarted.compact_journal())
+        self.assertEqual(rows(self.file_manager().load_expenses()), rows([self.first, extra, self.second, self.third]))
+    
+    def test_damaged_log_tail(self):
+        fm = self.file_manager()
+        fm.append_expense(self.first)
+        fm.append_expense(self.second)
+        with open(fm.journal_file, "ab") as file:
+            file.write(b'3 00000000 {"op":"add","row":["2024-01-0')  # torn write
+        
+        restarted = self.file_manager()
+        self.assertEqual(rows(restarted.load_expenses()), rows([self.first, self.second]))
+        
+        # The torn record is cut off before new records are appended
+        restarted.append_expense(self.third)
+        self.assertEqual(rows(self.file_manager().load_expenses()), rows([self.first, self.second, self.third]))
+    
+    def test_corrupt_record_ends_replay(self):
+        fm = self.file_manager()
+        fm.append_expense(self.first)
+        fm.append_expense(self.second)
+        fm.append_expense(self.third)
+        with open(fm.journal_file, "rb") as file:
+            lines = file.read().splitlines(keepends=True)
+        lines[1] = lines[1].replace(b"second", b"SECOND")
+        with open(fm.journal_file, "wb") as file:
+            file.write(b"".join(lines))
+        
+        self.assertEqual(rows(self.file_manager().load_expenses()), rows([self.first]))
+    
+    def test_clear_then_add(self):
+        fm = self.file_manager()
+        fm.save_expenses([self.first, self.second])
+        fm.clear_expenses()
+        fm.append_expense(self.third)
+        
+        self.assertEqual(rows(self.file_manager().load_expenses()), rows([self.third]))
+        
+        # Compaction folds the clear into the expenses file
+        restarted = self.file_manager()
+        self.assertTrue(restarted.compact_journal())
+        self.assertFalse(os.path.exists(restarted.journal_file))
+        self.assertEqual(rows(self.file_manager().load_expenses()), rows([self.third]))
+
+class SnapshotTests(PersistenceTestCase):
+    """Binary snapshot format and its freshness checks"""
+    
+    def test_round_trip(self):
+        snapshot = ExpenseSnapshot.from_expenses([self.first, self.second, self.first], wal_seq=7)
+        decoded, header = ExpenseSnapshot.from_bytes(snapshot.to_bytes(123, 456))
+        
+        self.assertEqual((header["source_size"], header["source_mtime_ns"], header["wal_seq"]), (123, 456, 7))
+        self.assertEqual(decoded.pool, ["first", "second"])
+        loaded = []
+        decoded.load_into(loaded)
+        self.assertEqual(rows(loaded), rows([self.first, self.second, self.first]))
+    
+    def test_truncated_data_is_rejected(self):
+        data = ExpenseSnapshot.from_expenses([self.first, self.second]).to_bytes(0, 0)
+        for cut in (10, ExpenseSnapshot.HEADER.size + 4, len(data) - 1):
+            with self.assertRaises(ValueError):
+                ExpenseSnapshot.from_bytes(data[:cut])
+    
+    def test_snapshot_plus_pending_log_records(self):
+        fm = self.file_manager()
+        fm.save_expenses([self.first, self.second])
+        fm.append_expense(self.third)
+        
+        restarted = self.file_manager()
+        self.assertIsNotNone(restarted._load_snapshot())
+        self.assertEqual(rows(restarted.load_expenses()), rows([self.first, self.second, self.third]))
+    
+    def test_stale_snapshot_is_rejected(self):
+        fm = self.file_manager()
+        fm.save_expenses([self.first])
+        
+        # The expenses file changes behind the snapshot's back
+        with open(fm.expenses_file, "a", encoding="utf-8", newline="") as file:
+            file.write("2024-01-02,Food,20.00,second\r\n")
+        
+        restarted = self.file_manager()
+        self.assertIsNone(restarted._load_snapshot())
+        self.assertIsNone(restarted.open_snapshot())
+        self.assertEqual(rows(restarted.load_expenses()), rows([self.first, self.second]))
+    
+    def test_corrupt_snapshot_is_rejected(self):
+        fm = self.file_manager()
+        fm.save_expenses([self.first, self.second])
+        
+        # Flip one body byte without changing the file's size or mtime
+        stat = os.stat(fm.snapshot_file)
+        with open(fm.snapshot_file, "r+b") as file:
+            file.seek(ExpenseSnapshot.HEADER.size + 2)
+            byte = file.read(1)
+            file.seek(-1, os.SEEK_CUR)
+            file.write(bytes([byte[0] ^ 0xFF]))
+        os.utime(fm.snapshot_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        
+        restarted = self.file_manager()
+        self.assertIsNone(restarted._load_snapshot())
+        self.assertIsNone(restarted.open_snapshot())
+        self.assertEqual(restarted.summarize()["count"], 2)
+        self.assertEqual(rows(restarted.load_expenses()), rows([self.first, self.second]))
+
+class BackupTests(PersistenceTestCase):
+    """Backups taken and restored alongside the write-ahead log"""
+    
+    def test_backup_includes_journaled_adds(self):
+        fm = self.file_manager()
+        fm.save_expenses([self.first])
+        fm.append_expense(self.second)
+        fm.append_expense(self.third)
+        
+        backup = fm.create_backup()
+        self.assertTrue(fm.restore_backup(backup))
+        self.assertEqual(rows(self.file_manager().load_expenses()), rows([self.first, self.second, self.third]))
+    
+    def test_delta_backups_follow_rewrites(self):
+        fm = FileManager(self.data_folder, delta_backups=True, backup_on_save=False, backup_retention=None)
+        fm.save_expenses([self.first, self.second])
+        self.assertTrue(fm.create_backup().endswith(".csv"))
+        
+        # A same-size edit of an earlier row is a rewrite: full backup
+        edited = make_expense("20", 2, "SECOND")
+        fm.save_expenses([self.first, edited])
+        self.assertFalse(fm.create_backup().endswith(".delta.csv"))
+        
+        # Only appending keeps the generation: delta backup
+        fm.save_expenses([self.first, edited, self.third])
+        backup = fm.create_backup()
+        self.assertTrue(backup.endswith(".delta.csv"))
+        
+        fm.save_expenses([self.first])
+        self.assertTrue(fm.restore_backup(backup))
+        self.assertEqual(rows(fm.load_expenses()), rows([self.first, edited, self.third]))
+    
+    def test_sqlite_row_writes_and_delta_backup(self):
+        fm = FileManager(self.data_folder, backend="sqlite", delta_backups=True, backup_on_save=False, backup_retention=None)
+        fm.save_expenses([self.first, self.second])
+        fm.append_expense(self.third)
+        self.assertTrue(fm.create_backup().endswith(".csv"))
+        
+        # Adds keep the generation: delta backup
+        fourth = make_expense("4", 4, "fourth")
+        fm.append_expense(fourth)
+        backup = fm.create_backup()
+        self.assertTrue(backup.endswith(".delta.csv"))
+        
+        # A single-row delete and update touch only their own rows
+        edited = make_expense("7", 1, "FIRST")
+        self.assertTrue(fm.delete_row(1))
+        self.assertTrue(fm.update_row(0, edited))
+        self.assertEqual(rows(fm.load_expenses()), rows([edited, self.third, fourth]))
+        self.assertFalse(fm.create_backup().endswith(".delta.csv"))
+        
+        self.assertTrue(fm.restore_backup(backup))
+        self.assertEqual(rows(fm.load_expenses()), rows([self.first, self.second, self.third, fourth]))
+
+class PruneTests(PersistenceTestCase):
+    """Retention pruning of delta backup chains"""
+    
+    def backups(self, fm):
+        """Full backup of first, then one delta per later add"""
+        fm.save_expenses([self.first])
+        paths = [fm.create_backup()]
+        for expense in (self.second, self.third, make_expense("4", 4, "fourth")):
+            fm.append_expense(expense)
+            paths.append(fm.create_backup())
+        return paths
+    
+    def file_manager(self):
+        return FileManager(self.data_folder, delta_backups=True, backup_on_save=False, backup_retention=None)
+    
+    def retention(self, fm, paths):
+        """Keep the last two backups, bucket older ones by day"""
+        created = [fm._backup_time(os.path.basename(path)) for path in paths]
+        fm.backup_retention = [(created[-1] - created[-2], "all"), (None, "day")]
+        return created[-1]
+    
+    def test_restore_delta_chain_after_prune(self):
+        fm = self.file_manager()
+        paths = self.backups(fm)
+        self.assertEqual(fm.prune_backups(self.retention(fm, paths)), 1)
+        
+        # The pruned full backup was folded into the next one; the last
+        # two backups are still deltas on top of it
+        kinds = [entry["kind"] for entry in fm._load_backup_index()["entries"]]
+        self.assertEqual(kinds, ["full", "delta", "delta"])
+        self.assertTrue(fm.restore_backup(paths[-1]))
+        self.assertEqual(len(self.file_manager().load_expenses()), 4)
+    
+    def test_interrupted_prune(self):
+        fm = self.file_manager()
+        paths = self.backups(fm)
+        now = self.retention(fm, paths)
+        
+        # The process dies after recording the new chain, before any
+        # file is moved: the next index load finishes the prune
+        def crash(index):
+            raise OSError("simulated crash")
+        fm._finish_pending_prune = crash
+        fm.prune_backups(now)
+        
+        restarted = self.file_manager()
+        self.assertEqual(len(restarted._load_backup_index()["entries"]), 3)
+        self.assertFalse([name for name in os.listdir(restarted.backup_folder) if name.endswith(".merge")])
+        self.assertTrue(restarted.restore_backup(paths[-1]))
+        self.assertEqual(len(self.file_manager().load_expenses()), 4)
+    
+    def test_prune_crash_before_index_leaves_no_orphans(self):
+        fm = self.file_manager()
+        paths = self.backups(fm)
+        now = self.retention(fm, paths)
+        
+        # The merged file is written, the index never updated
+        def crash(index):
+            raise OSError("simulated crash")
+        fm._save_backup_index = crash
+        fm.prune_backups(now)
+        self.assertTrue([name for name in os.listdir(fm.backup_folder) if name.endswith(".merge")])
+        
+        restarted = self.file_manager()
+        self.assertEqual(len(restarted._load_backup_index()["entries"]), 4)
+        self.assertFalse([name for name in os.listdir(restarted.backup_folder) if name.endswith(".merge")])
+        self.assertTrue(restarted.restore_backup(paths[-1]))
+        self.assertEqual(len(self.file_manager().load_expenses()), 4)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
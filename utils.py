@@ -4,7 +4,45 @@ Helper functions for validation, formatting, etc.
 """
 
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+# Distinct date strings remembered by parse_date; real data spans only a
+# few thousand days, so bulk loads hit the cache almost every row
+DATE_CACHE_SIZE = 8192
+
+# Largest amount accepted for storage (₹10,000 crore). Amounts live in
+# int64 columns and are summed into int64 prefix sums, so this keeps
+# even millions of maximal rows far from overflowing
+MAX_PAISE = 10 ** 13
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(date_str):
+    """
+    Parse a YYYY-MM-DD date string
+    
+    Well-formed strings are sliced and range-checked directly; anything
+    else falls back to strptime so that e.g. "2024-1-5" is still read
+    (and normalized to "2024-01-05").
+    
+    Args:
+        date_str (str): Date string
+    
+    Returns:
+        tuple: (canonical YYYY-MM-DD string, day ordinal)
+    
+    Raises:
+        ValueError: If date_str is not a valid date
+    """
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+        year, month, day = date_str[:4], date_str[5:7], date_str[8:]
+        if year.isdigit() and month.isdigit() and day.isdigit():
+            # date() rejects out-of-range months and days
+            return date_str, date(int(year), int(month), int(day)).toordinal()
+    
+    parsed = datetime.strptime(date_str, "%Y-%m-%d").date()
+    return parsed.isoformat(), parsed.toordinal()
 
 def validate_date(date_str):
     """
@@ -20,13 +58,10 @@ def validate_date(date_str):
         return False, "Date cannot be empty"
     
     try:
-        datetime.strptime(date_str, "%Y-%m-%d")
+        _, day = parse_date(date_str)
         
         # Check if date is not in the future
-        input_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        today = datetime.now().date()
-        
-        if input_date > today:
+        if day > date.today().toordinal():
             return False, "Date cannot be in the future"
         
         return True, ""
@@ -83,17 +118,72 @@ def validate_category(category, valid_categories):
     
     return True, ""
 
-def format_currency(amount):
+def to_paise(amount):
+    """
+    Convert an amount in rupees to integer paise
+    
+    Strings are parsed exactly (no float round trip) and rounded half
+    up to the nearest paisa.
+    
+    Args:
+        amount (str, int or float): Amount in rupees
+    
+    Returns:
+        int: Amount in paise
+    
+    Raises:
+        ValueError: If amount is not a valid number or its size exceeds
+            MAX_PAISE
+    """
+    text = str(amount).strip()
+    
+    # Fast path for plain "123" / "123.4" / "123.45" strings
+    rupees, _, fraction = text.partition(".")
+    if rupees.isdecimal() and len(fraction) <= 2 and (not fraction or fraction.isdecimal()):
+        paise = int(rupees) * 100 + int(fraction.ljust(2, "0") or 0)
+    else:
+        try:
+            value = Decimal(text) * 100
+            if not value.is_finite():
+                raise ValueError("Amount must be a valid number")
+            # Checked before quantize, which fails on e.g. "1e30"
+            if abs(value) > MAX_PAISE:
+                raise ValueError("Amount is too large")
+            paise = int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        except ArithmeticError:
+            raise ValueError("Amount must be a valid number")
+    
+    if abs(paise) > MAX_PAISE:
+        raise ValueError("Amount is too large")
+    return paise
+
+def paise_to_str(paise):
     """
-    Format amount as Indian Rupees
+    Convert integer paise to a plain decimal string (e.g. "1234.50")
     
     Args:
-        amount (float): Amount to format
+        paise (int): Amount in paise
+    
+    Returns:
+        str: Amount in rupees with two decimal places
+    """
+    sign = "-" if paise < 0 else ""
+    rupees, remainder = divmod(abs(int(paise)), 100)
+    return f"{sign}{rupees}.{remainder:02d}"
+
+def format_currency(paise):
+    """
+    Format an amount in paise as Indian Rupees
+    
+    Args:
+        paise (int): Amount in paise (averages may be fractional)
     
     Returns:
         str: Formatted currency string
     """
-    return f"₹{amount:,.2f}"
+    sign = "-" if paise < 0 else ""
+    rupees, remainder = divmod(abs(round(paise)), 100)
+    return f"₹{sign}{rupees:,}.{remainder:02d}"
 
 def format_date(date_str):
     """
@@ -115,6 +205,68 @@ def get_current_month():
     """Get current month in YYYY-MM format"""
     return datetime.now().strftime("%Y-%m")
 
+def month_day_range(month_str):
+    """
+    Get the first and last day ordinals of a month
+    
+    Args:
+        month_str (str): Month in YYYY-MM format
+    
+    Returns:
+        tuple: (first_day, last_day) as date.toordinal() values
+    """
+    first = datetime.strptime(f"{month_str}-01", "%Y-%m-%d").date()
+    next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first.toordinal(), next_month.toordinal() - 1
+
+def quarter_range(year, quarter):
+    """
+    Get the first and last date of a calendar quarter
+    
+    Args:
+        year (int): Calendar year
+        quarter (int): Quarter number 1-4
+    
+    Returns:
+        tuple: (start_date, end_date) in YYYY-MM-DD format
+    """
+    if not 1 <= quarter <= 4:
+        raise ValueError("Quarter must be between 1 and 4")
+    first_month = (quarter - 1) * 3 + 1
+    start = date(year, first_month, 1)
+    _, last_day = month_day_range(f"{year:04d}-{first_month + 2:02d}")
+    return start.isoformat(), date.fromordinal(last_day).isoformat()
+
+def fiscal_year_range(year, start_month=4):
+    """
+    Get the first and last date of a fiscal year
+    
+    Args:
+        year (int): Calendar year in which the fiscal year starts
+        start_month (int): First month of the fiscal year (default:
+            April, as used for Indian financial years)
+    
+    Returns:
+        tuple: (start_date, end_date) in YYYY-MM-DD format
+    """
+    start = date(year, start_month, 1)
+    end = date(year + 1, start_month, 1) - timedelta(days=1)
+    return start.isoformat(), end.isoformat()
+
+def last_n_days(days, today=None):
+    """
+    Get the date range covering the last N days, including today
+    
+    Args:
+        days (int): Number of days
+        today (date): Reference date (default: today)
+    
+    Returns:
+        tuple: (start_date, end_date) in YYYY-MM-DD format
+    """
+    today = today or date.today()
+    return (today - timedelta(days=days - 1)).isoformat(), today.isoformat()
+
 def get_month_name(month_str):
     """Convert YYYY-MM to month name"""
     try: